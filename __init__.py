@@ -16,18 +16,30 @@ limitations under the License.
 
 import os
 import urllib
+import urllib.parse
 import requests
+from urllib3.exceptions import NewConnectionError
 import threading
 import time
+import queue
 from collections import OrderedDict
 import subprocess
 import tempfile
+import sys
 import json
 import shutil
-from uuid import UUID
+import hashlib
+import zipfile
+import zlib
+import struct
+from uuid import UUID, uuid4
+from math import ceil, sqrt
+from collections import deque
 
 import bpy
 import bpy.utils.previews
+from bpy.app.handlers import persistent
+from mathutils import Vector
 from bpy.props import (StringProperty,
                        EnumProperty,
                        BoolProperty,
@@ -124,12 +136,89 @@ class Config:
                          ('VIEWS', "Views", ""),
                          ('RECENT', "Recent", ""))
 
+    SKETCHFAB_TEXTURE_SIZES = (('0', "Original", "Keep the original textures"),
+                               ('4096', "4096 px", ""),
+                               ('2048', "2048 px", ""),
+                               ('1024', "1024 px", ""),
+                               ('512', "512 px", ""))
+
     SKETCHFAB_SEARCH_DOMAIN = (('DEFAULT', "All site", "", 0),
                                ('OWN', "Own Models (PRO)", "", 1),
                                ('STORE', "Store purchases", "", 2))
 
     MAX_THUMBNAIL_HEIGHT = 256
 
+    # Streaming downloads: the read size adapts to the measured throughput,
+    # aiming for one read every DOWNLOAD_READ_INTERVAL seconds
+    DOWNLOAD_MIN_CHUNK_SIZE = 64 * 1024
+    DOWNLOAD_MAX_CHUNK_SIZE = 4 * 1024 * 1024
+    DOWNLOAD_WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+    DOWNLOAD_READ_INTERVAL = 0.05
+
+    # Transfers are sorted in classes, each with a share of the bandwidth used
+    # when several classes compete for the link, and a maximum number of
+    # concurrent transfers
+    TRANSFER_CLASSES = {
+        'INTERACTIVE': {'share': 6, 'concurrency': 8}, # Searches, thumbnails, model info
+        'IMPORT':      {'share': 3, 'concurrency': 2}, # Model archives
+        'BACKGROUND':  {'share': 1, 'concurrency': 1}, # Speculative prefetches
+    }
+    TRANSFER_BURST = 0.25 # Seconds of bandwidth a transfer can use in one go
+
+    # Signed download urls are not reused during their last seconds of validity
+    DOWNLOAD_URL_EXPIRY_MARGIN = 30
+
+    # Number of times a corrupt or incomplete archive is downloaded again
+    DOWNLOAD_MAX_ATTEMPTS = 2
+
+    # Archives are extracted by a pool of threads writing through large buffers
+    EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+    EXTRACT_BUFFER_SIZE = 1024 * 1024
+
+    # Background imports are polled twice per second
+    IMPORT_WORKER_POLL_INTERVAL = 0.5
+
+    # Meshes lighter than this are never decimated, nor reduced below the min ratio.
+    # The face budget lowers it for models of many meshes
+    DECIMATE_MIN_FACES = 1000
+    DECIMATE_MIN_RATIO = 0.01
+    # Ratio of each level of detail, relative to the imported model
+    LOD_RATIOS = (1.0, 0.5, 0.1)
+
+    # Batch imports keep as many downloads running as the IMPORT transfer class
+    # allows, so that signed urls do not expire while waiting for bandwidth
+    BATCH_COLLECTION_NAME = "Sketchfab Batch"
+    BATCH_GRID_MARGIN = 0.2 # Space between models, relative to their size
+    BATCH_DOWNLOAD_TIMEOUT = 300 # Seconds without progress before a download is considered failed
+
+    # Steps timed in import reports, and number of reports shown in the panel
+    IMPORT_REPORT_STEPS = ('download', 'unzip', 'textures', 'import', 'cleanup')
+    IMPORT_REPORTS_SHOWN = 5
+
+    # Export preparation runs in a background Blender, polled 4 times per second
+    # and reporting its progress on lines starting with this prefix
+    EXPORT_POLL_INTERVAL = 0.25
+    SKETCHFAB_PROGRESS_PREFIX = "SKETCHFAB_PROGRESS "
+
+    # Multithreaded compression of exported files, by chunks compressed independently
+    EXPORT_COMPRESSION_CHUNK_SIZE = 4 * 1024 * 1024
+    EXPORT_COMPRESSION_WORKERS = min(8, os.cpu_count() or 1)
+    # Zstandard frames are indexed by a seek table, as written by Blender
+    ZSTD_SKIPPABLE_MAGIC = 0x184D2A5E
+    ZSTD_SEEKABLE_MAGIC = 0x8F92EAB1
+
+    # Number of datablocks listed in the export size estimate
+    SIZE_ESTIMATE_SHOWN = 8
+    # Stored size of a keyframe, for the estimate of actions
+    KEYFRAME_SIZE = 40
+
+    # Failed uploads are sent again after 2, then 4 seconds
+    UPLOAD_MAX_ATTEMPTS = 3
+    UPLOAD_RETRY_DELAY = 2
+
+    # UI updates coming from worker threads are published at most at 10Hz
+    PROGRESS_UPDATE_INTERVAL = 0.1
+
     SKETCHFAB_UPLOAD_LIMITS = {
         "basic" : 100 * 1024 * 1024,
         "pro": 200 * 1024 * 1024,
@@ -189,6 +278,88 @@ class Utils:
     def clean_downloaded_model_dir(uid):
         shutil.rmtree(os.path.join(Config.SKETCHFAB_MODEL_DIR, uid))
 
+    def get_archive_record_path(archive_path):
+        return archive_path + '.json'
+
+    def write_archive_record(archive_path, size, digest):
+        """
+        Stores the size and sha256 of a downloaded archive next to it, with its
+        modification time to avoid hashing the file again on cache hits
+        """
+        with open(Utils.get_archive_record_path(archive_path), 'w') as f:
+            json.dump({
+                'size': size,
+                'sha256': digest,
+                'mtime': os.stat(archive_path).st_mtime_ns,
+            }, f)
+
+    def read_archive_record(archive_path):
+        try:
+            with open(Utils.get_archive_record_path(archive_path), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def hash_file(filepath):
+        file_hash = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for data in iter(lambda: f.read(Config.DOWNLOAD_MAX_CHUNK_SIZE), b''):
+                file_hash.update(data)
+        return file_hash.hexdigest()
+
+    def is_archive_valid(archive_path):
+        """
+        Checks a cached archive against its download record: the size is always
+        compared, the content is only hashed again if the file was modified
+        """
+        record = Utils.read_archive_record(archive_path)
+        if record is None or not os.path.exists(archive_path):
+            return False
+
+        stat = os.stat(archive_path)
+        if stat.st_size != record['size']:
+            return False
+        if stat.st_mtime_ns != record['mtime']:
+            if Utils.hash_file(archive_path) != record['sha256']:
+                return False
+            Utils.write_archive_record(archive_path, record['size'], record['sha256'])
+
+        return zipfile.is_zipfile(archive_path)
+
+    def remove_archive(archive_path):
+        for path in [archive_path, Utils.get_archive_record_path(archive_path)]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def get_extract_path(extract_dir, name):
+        # Same sanitization as zipfile.ZipFile.extract
+        name = os.path.splitdrive(name.replace('\\', '/'))[1]
+        parts = [x for x in name.split('/') if x not in ('', os.curdir, os.pardir)]
+        return os.path.join(extract_dir, *parts) if parts else None
+
+    def get_gltf_references(gltf_data, gltf_name='scene.gltf'):
+        """
+        Returns the archive paths of the buffers and images referenced by a glTF
+        file, or None if it can't be parsed
+        """
+        import posixpath
+        try:
+            gltf = json.loads(gltf_data)
+        except ValueError:
+            return None
+
+        references = set([gltf_name])
+        try:
+            for item in gltf.get('buffers', []) + gltf.get('images', []):
+                uri = item.get('uri')
+                if uri and not uri.startswith('data:'):
+                    path = posixpath.join(posixpath.dirname(gltf_name), urllib.parse.unquote(uri))
+                    references.add(posixpath.normpath(path))
+        except (AttributeError, TypeError):
+            # Valid JSON, but not a glTF document
+            return None
+        return references
+
     def get_thumbnail_url(thumbnails_json):
         min_height  = 1e6
         min_thumbnail = None
@@ -221,58 +392,348 @@ class Utils:
             ShowMessage("ERROR", "Url parsing error", "Error getting uid from url: {}".format(model_url))
             return None
 
+    def get_org_uid_from_model_url(model_url):
+        if "/orgs/" in model_url:
+            return model_url.split('/')[5]
+        return ""
+
     def get_uid_from_download_url(model_url):
         return model_url.split('/')[6]
 
+    def remove_datablocks(datablocks, collection):
+        """
+        Removes datablocks of one type (collection being bpy.data.objects,
+        bpy.data.meshes...) in a single pass when Blender allows it
+        """
+        if hasattr(bpy.data, "batch_remove"):
+            bpy.data.batch_remove(datablocks)
+        else:
+            for datablock in datablocks:
+                collection.remove(datablock)
+
     def clean_node_hierarchy(objects, root_name):
         """
         Removes the useless nodes in a hierarchy
         TODO: Keep the transform (might impact Yup/Zup)
         """
-        # Find the parent object
+        # Find the parent object, and map the children of every object in one pass
+        # (Object.children iterates over all the objects of the file on each call)
         root = None
+        children = {}
         for object in objects:
             if object.parent is None:
                 root = object
+            else:
+                children.setdefault(object.parent.as_pointer(), []).append(object)
         if root is None:
             return None
 
         # Go down its hierarchy until one child has multiple children, or a single mesh
-        # Keep the name while deleting objects in the hierarchy
-        diverges = False
-        while diverges==False:
-            children = root.children
-            if children is not None:
-
-                if len(children)>1:
-                    diverges = True
-                    root.name = root_name
-
-                if len(children)==1:
-                    if children[0].type != "EMPTY":
-                        diverges = True
-                        root.name = root_name
-                        if children[0].type == "MESH": # should always be the case
-                            matrixcopy = children[0].matrix_world.copy()
-                            children[0].parent = None
-                            children[0].matrix_world = matrixcopy
-                            bpy.data.objects.remove(root)
-                            children[0].name = root_name
-                            root = children[0]
-
-                    elif children[0].type == "EMPTY":
-                        diverges = False
-                        matrixcopy = children[0].matrix_world.copy()
-                        children[0].parent = None
-                        children[0].matrix_world = matrixcopy
-                        bpy.data.objects.remove(root)
-                        root = children[0]
-            else:
+        # The empties above are collected and deleted all at once
+        removed = []
+        while True:
+            root_children = children.get(root.as_pointer(), [])
+            if len(root_children) != 1 or root_children[0].type not in ("EMPTY", "MESH"):
+                break
+            removed.append(root)
+            root = root_children[0]
+            if root.type == "MESH": # should always be the case
                 break
 
+        if removed:
+            matrixcopy = root.matrix_world.copy()
+            root.parent = None
+            root.matrix_world = matrixcopy
+            Utils.remove_datablocks(removed, bpy.data.objects)
+
+        # Keep the name once the other nodes are deleted
+        root.name = root_name
+
         # Select the root Empty node
         root.select_set(True)
 
+    def get_mesh_key(mesh):
+        """
+        Hashes the geometry of a mesh (vertices, faces, uvs, normals and attributes)
+        with foreach_get and NumPy. Returns the key and the size of the hashed buffers
+        """
+        import numpy as np
+
+        mesh_hash = hashlib.sha1()
+        size = 0
+
+        def add(collection, attribute, length, dtype):
+            nonlocal size
+            array = np.empty(length, dtype=dtype)
+            collection.foreach_get(attribute, array)
+            mesh_hash.update(array.tobytes())
+            size += array.nbytes
+
+        add(mesh.vertices, 'co', 3 * len(mesh.vertices), np.float32)
+        add(mesh.loops, 'vertex_index', len(mesh.loops), np.int32)
+        add(mesh.polygons, 'loop_start', len(mesh.polygons), np.int32)
+        add(mesh.polygons, 'material_index', len(mesh.polygons), np.int32)
+        for uv_layer in mesh.uv_layers:
+            mesh_hash.update(uv_layer.name.encode('utf-8'))
+            add(uv_layer.data, 'uv', 2 * len(mesh.loops), np.float32)
+
+        # Corner normals include the custom normals set by the glTF importer
+        if hasattr(mesh, 'corner_normals'):
+            add(mesh.corner_normals, 'vector', 3 * len(mesh.loops), np.float32)
+        else:
+            # Before Blender 4.1, they have to be computed first
+            mesh.calc_normals_split()
+            add(mesh.loops, 'normal', 3 * len(mesh.loops), np.float32)
+            mesh.free_normals_split()
+
+        # Generic attributes (vertex colors...)
+        components = {
+            'FLOAT': ('value', 1, np.float32), 'INT': ('value', 1, np.int32),
+            'INT8': ('value', 1, np.int32), 'BOOLEAN': ('value', 1, bool), 'FLOAT2': ('vector', 2, np.float32),
+            'FLOAT_VECTOR': ('vector', 3, np.float32), 'FLOAT_COLOR': ('color', 4, np.float32),
+            'BYTE_COLOR': ('color', 4, np.float32), 'INT16_2D': ('value', 2, np.int32),
+            'INT32_2D': ('value', 2, np.int32),
+        }
+        for attribute in getattr(mesh, 'attributes', []):
+            if attribute.name.startswith('.'):
+                # Internal state (selection, hidden...)
+                continue
+            mesh_hash.update('{}{}{}'.format(attribute.name, attribute.domain, attribute.data_type).encode('utf-8'))
+            if attribute.data_type not in components:
+                # Unknown layout, never share this mesh
+                mesh_hash.update(str(mesh.as_pointer()).encode('utf-8'))
+                continue
+            field, count, dtype = components[attribute.data_type]
+            add(attribute.data, field, count * len(attribute.data), dtype)
+
+        materials = tuple(m.as_pointer() if m else 0 for m in mesh.materials)
+        unique = mesh.as_pointer() if mesh.shape_keys else 0
+        return (len(mesh.vertices), len(mesh.loops), materials, unique, mesh_hash.hexdigest()), size
+
+    def deduplicate_meshes(objects):
+        """
+        Links the objects using identical geometry to a single mesh datablock.
+        Returns the number of meshes removed and the size of their buffers
+        """
+        users = Utils.get_mesh_users(objects)
+
+        shared = {}
+        removed = []
+        saved_size = 0
+        for mesh, mesh_users in users.values():
+            key, size = Utils.get_mesh_key(mesh)
+            if key not in shared:
+                shared[key] = mesh
+                continue
+            for ob in mesh_users:
+                ob.data = shared[key]
+            if mesh.users == 0:
+                removed.append(mesh)
+                saved_size += size
+
+        Utils.remove_datablocks(removed, bpy.data.meshes)
+
+        if removed:
+            print('Shared {} duplicated mesh(es), saved {}'.format(len(removed), Utils.humanify_size(saved_size)))
+        return len(removed), saved_size
+
+    def get_mesh_users(objects):
+        """
+        Groups the mesh objects by the mesh they use
+        """
+        users = OrderedDict()
+        for ob in objects:
+            if ob.type == 'MESH' and ob.data is not None:
+                users.setdefault(ob.data.as_pointer(), (ob.data, []))[1].append(ob)
+        return users
+
+    def get_face_count(objects):
+        return sum(len(ob.data.polygons) for ob in objects if ob.type == 'MESH' and ob.data is not None)
+
+    def get_decimation_threshold(objects, face_budget):
+        """
+        Returns the face count under which meshes are kept as they are. Below
+        budget / mesh objects, the light meshes alone always fit in the budget
+        """
+        mesh_objects = sum(1 for ob in objects if ob.type == 'MESH' and ob.data is not None)
+        if not face_budget or not mesh_objects:
+            return Config.DECIMATE_MIN_FACES
+        return min(Config.DECIMATE_MIN_FACES, face_budget // mesh_objects)
+
+    def is_decimatable(mesh, min_faces):
+        # Shape keys would be lost
+        return len(mesh.polygons) >= min_faces and not mesh.shape_keys
+
+    def get_decimation_ratio(objects, face_budget, min_faces=Config.DECIMATE_MIN_FACES):
+        """
+        Returns the ratio to apply to the heavy meshes of a model so that it fits
+        in the face budget, the light ones being kept as they are. Decimated
+        meshes are made of triangles, the ratio applies to their triangle count
+        """
+        if not face_budget or Utils.get_face_count(objects) <= face_budget:
+            return 1.0
+
+        light_faces = 0
+        heavy_triangles = 0
+        for ob in objects:
+            if ob.type != 'MESH' or ob.data is None:
+                continue
+            if Utils.is_decimatable(ob.data, min_faces):
+                ob.data.calc_loop_triangles()
+                heavy_triangles += len(ob.data.loop_triangles)
+            else:
+                light_faces += len(ob.data.polygons)
+        if not heavy_triangles:
+            return 1.0
+        return max(Config.DECIMATE_MIN_RATIO, min(1.0, (face_budget - light_faces) / heavy_triangles))
+
+    def decimate_mesh(ob, ratio):
+        """
+        Returns a decimated copy of the mesh of an object, evaluated with
+        a temporary Decimate modifier (other modifiers are ignored)
+        """
+        enabled = [m for m in ob.modifiers if m.show_viewport]
+        for m in enabled:
+            m.show_viewport = False
+        modifier = ob.modifiers.new("Decimate", 'DECIMATE')
+        modifier.ratio = ratio
+        try:
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            decimated = bpy.data.meshes.new_from_object(ob.evaluated_get(depsgraph))
+        finally:
+            ob.modifiers.remove(modifier)
+            for m in enabled:
+                m.show_viewport = True
+        decimated.name = ob.data.name
+        return decimated
+
+    def decimate_meshes(objects, ratio, min_faces=Config.DECIMATE_MIN_FACES):
+        """
+        Decimates the heavy meshes of the objects. Returns the decimated meshes,
+        indexed by the pointer of the original ones
+        """
+        decimated = {}
+        if ratio >= 1.0:
+            return decimated
+
+        for pointer, (mesh, users) in Utils.get_mesh_users(objects).items():
+            if not Utils.is_decimatable(mesh, min_faces):
+                continue
+            decimated[pointer] = Utils.decimate_mesh(users[0], ratio)
+        return decimated
+
+    def apply_face_budget(objects, face_budget):
+        """
+        Decimates the model in place so that it fits in the face budget.
+        Returns its face count, still over the budget when the meshes with
+        shape keys or the min ratio do not allow it
+        """
+        face_count = Utils.get_face_count(objects)
+        min_faces = Utils.get_decimation_threshold(objects, face_budget)
+        ratio = Utils.get_decimation_ratio(objects, face_budget, min_faces)
+        if ratio >= 1.0:
+            return face_count
+
+        users = Utils.get_mesh_users(objects)
+        removed = []
+        for pointer, mesh in Utils.decimate_meshes(objects, ratio, min_faces).items():
+            original, mesh_users = users[pointer]
+            for ob in mesh_users:
+                ob.data = mesh
+            if original.users == 0:
+                removed.append(original)
+
+        Utils.remove_datablocks(removed, bpy.data.meshes)
+
+        decimated_count = Utils.get_face_count(objects)
+        print('Decimated model from {} to {} faces'.format(Utils.humanify_number(face_count), Utils.humanify_number(decimated_count)))
+        return decimated_count
+
+    def generate_lods(objects, title, ratios=Config.LOD_RATIOS):
+        """
+        Moves the model in a LOD0 collection, and creates a decimated copy of it
+        in one collection per level of detail. Only the first level is visible
+        """
+        if not objects:
+            return []
+
+        parent_collection = objects[0].users_collection[0] if objects[0].users_collection else bpy.context.scene.collection
+        collections = []
+        for level, ratio in enumerate(ratios):
+            collection = bpy.data.collections.new('{}_LOD{}'.format(title, level))
+            parent_collection.children.link(collection)
+            collections.append(collection)
+
+            if level == 0:
+                for ob in objects:
+                    for users_collection in ob.users_collection:
+                        users_collection.objects.unlink(ob)
+                    collection.objects.link(ob)
+                continue
+
+            # Copies share the light meshes, and keep the hierarchy of the model
+            decimated = Utils.decimate_meshes(objects, ratio)
+            copies = {}
+            for ob in objects:
+                copy = ob.copy()
+                copy.name = '{}_LOD{}'.format(ob.name, level)
+                if ob.type == 'MESH' and ob.data is not None:
+                    copy.data = decimated.get(ob.data.as_pointer(), ob.data)
+                copies[ob.as_pointer()] = copy
+                collection.objects.link(copy)
+            for ob in objects:
+                if ob.parent is not None and ob.parent.as_pointer() in copies:
+                    copies[ob.as_pointer()].parent = copies[ob.parent.as_pointer()]
+
+            collection.hide_viewport = True
+            collection.hide_render = True
+
+        print('Generated {} levels of detail'.format(len(ratios)))
+        return collections
+
+    def get_bounding_box(objects, matrix=None):
+        """
+        Returns the (min, max) corners of the world bounding box of the objects,
+        including the content of collection instances, or None if empty
+        """
+        corners = []
+        for ob in objects:
+            ob_matrix = ob.matrix_world if matrix is None else matrix @ ob.matrix_world
+            if ob.instance_type == 'COLLECTION' and ob.instance_collection is not None:
+                bounding_box = Utils.get_bounding_box(ob.instance_collection.all_objects, ob_matrix)
+                if bounding_box is not None:
+                    corners.extend(bounding_box)
+            elif ob.type in {'MESH', 'CURVE', 'SURFACE', 'META', 'FONT'}:
+                corners.extend(ob_matrix @ Vector(corner) for corner in ob.bound_box)
+
+        if not corners:
+            return None
+        return (Vector([min(c[i] for c in corners) for i in range(3)]),
+                Vector([max(c[i] for c in corners) for i in range(3)]))
+
+    def get_image_memory_size(image):
+        """
+        Returns the size of the decoded pixels of an image, plus its packed data
+        """
+        width, height = image.size
+        size = width * height * image.channels * (4 if image.is_float else 1)
+        if image.packed_file is not None:
+            size += image.packed_file.size
+        return size
+
+    def get_peak_rss():
+        """
+        Returns the peak resident memory of Blender in bytes, or None when the
+        platform does not expose it (resource is not available on Windows)
+        """
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
     def is_valid_uuid(uuid_to_test, version=4):
         try:
             uuid_obj = UUID(hex=uuid_to_test, version=version)
@@ -285,6 +746,8 @@ class Cache:
         bpy.utils.user_resource("SCRIPTS", path="sketchfab_cache", create=True),
         ".cache"
     ) # Use a user path to avoid permission-related errors
+    # Upload threads write to the cache too, keys are updated one at a time
+    lock = threading.RLock()
 
     def read():
         if not os.path.exists(Cache.SKETCHFAB_CACHE_FILE):
@@ -292,7 +755,17 @@ class Cache:
 
         with open(Cache.SKETCHFAB_CACHE_FILE, 'rb') as f:
             data = f.read().decode('utf-8')
-            return json.loads(data)
+            try:
+                return json.loads(data)
+            except ValueError:
+                print('Invalid cache file, starting from an empty cache')
+                return {}
+
+    def write(cache_data):
+        # Replaced at once, so that the file is never read half written
+        with open(Cache.SKETCHFAB_CACHE_FILE + '.tmp', 'wb') as f:
+            f.write(json.dumps(cache_data).encode('utf-8'))
+        os.replace(Cache.SKETCHFAB_CACHE_FILE + '.tmp', Cache.SKETCHFAB_CACHE_FILE)
 
     def get_key(key):
         cache_data = Cache.read()
@@ -300,18 +773,256 @@ class Cache:
             return cache_data[key]
 
     def save_key(key, value):
-        cache_data = Cache.read()
-        cache_data[key] = value
-        with open(Cache.SKETCHFAB_CACHE_FILE, 'wb+') as f:
-            f.write(json.dumps(cache_data).encode('utf-8'))
+        with Cache.lock:
+            cache_data = Cache.read()
+            cache_data[key] = value
+            Cache.write(cache_data)
 
     def delete_key(key):
-        cache_data = Cache.read()
-        if key in cache_data:
-            del cache_data[key]
+        with Cache.lock:
+            cache_data = Cache.read()
+            if key in cache_data:
+                del cache_data[key]
+            Cache.write(cache_data)
+
+
+class ModelLibrary:
+    """
+    Persistent library of downloaded archives, stored by content hash and indexed
+    by model uid, and of the .blend files converted from them. Files are evicted
+    in least recently used order when the library grows above the quota set in
+    the addon preferences. Entries are invalidated when the model updatedAt
+    date changes
+    """
+    INDEX_FILE = "index.json"
+    BLEND_INDEX_FILE = "blends.json"
+    # Files linked by user scenes, never evicted nor cleared
+    LINKED_DIRECTORY = "linked"
+    lock = threading.RLock()
+
+    def get_directory():
+        libraryPath = get_addon_preferences().libraryPath
+        if libraryPath:
+            return os.path.abspath(bpy.path.abspath(libraryPath))
+        return os.path.join(os.path.dirname(Cache.SKETCHFAB_CACHE_FILE), "library")
+
+    # The directory is read from the preferences on the main thread, worker threads pass it
+
+    def get_archive_path(digest, directory=None):
+        return os.path.join(directory or ModelLibrary.get_directory(), digest[:2], '{}.zip'.format(digest))
+
+    def get_blend_path(uid, directory=None):
+        return os.path.join(directory or ModelLibrary.get_directory(), "blend", '{}.blend'.format(uid))
+
+    def get_linked_path(uid, updated_at=None):
+        # One file per version of the model, scenes linking an older one keep it
+        version = ''.join(c for c in updated_at if c.isalnum()) if updated_at else 'latest'
+        return os.path.join(ModelLibrary.get_directory(), ModelLibrary.LINKED_DIRECTORY, '{}_{}.blend'.format(uid, version))
+
+    def read_index(name=INDEX_FILE, directory=None):
+        index_path = os.path.join(directory or ModelLibrary.get_directory(), name)
+        if not os.path.exists(index_path):
+            return {}
+        try:
+            with open(index_path, 'r') as f:
+                return json.load(f)
+        except ValueError:
+            print('Invalid library index, starting from an empty library')
+            return {}
 
-        with open(Cache.SKETCHFAB_CACHE_FILE, 'wb+') as f:
-            f.write(json.dumps(cache_data).encode('utf-8'))
+    def write_index(index, name=INDEX_FILE, directory=None):
+        directory = directory or ModelLibrary.get_directory()
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        index_path = os.path.join(directory, name)
+        with open(index_path + '.tmp', 'w') as f:
+            json.dump(index, f)
+        os.replace(index_path + '.tmp', index_path)
+
+    def is_outdated(entry, updated_at):
+        return bool(updated_at and entry.get('updated_at') and entry['updated_at'] != updated_at)
+
+    def get(uid, updated_at=None):
+        """Returns the path of the archive stored for a model and marks it as used, or None"""
+        if not get_addon_preferences().useLibrary:
+            return None
+
+        with ModelLibrary.lock:
+            index = ModelLibrary.read_index()
+            entry = index.get(uid)
+            if entry is None:
+                return None
+
+            archive_path = ModelLibrary.get_archive_path(entry['sha256'])
+            if ModelLibrary.is_outdated(entry, updated_at) or not os.path.exists(archive_path) or os.path.getsize(archive_path) != entry['size']:
+                ModelLibrary.remove(uid)
+                return None
+
+            entry['last_used'] = time.time()
+            ModelLibrary.write_index(index)
+            return archive_path
+
+    def add(uid, title, archive_path, updated_at, directory, quota):
+        """Moves a verified downloaded archive to the library, called from the download thread"""
+        record = Utils.read_archive_record(archive_path)
+        if record is None:
+            return
+
+        with ModelLibrary.lock:
+            library_path = ModelLibrary.get_archive_path(record['sha256'], directory)
+            if not os.path.exists(library_path):
+                os.makedirs(os.path.dirname(library_path), exist_ok=True)
+                shutil.move(archive_path, library_path)
+            Utils.remove_archive(archive_path)
+
+            index = ModelLibrary.read_index(directory=directory)
+            index[uid] = {
+                'title': title,
+                'sha256': record['sha256'],
+                'size': record['size'],
+                'updated_at': updated_at,
+                'last_used': time.time(),
+            }
+            ModelLibrary.write_index(index, directory=directory)
+            ModelLibrary.evict(quota, directory)
+
+    def get_blend(uid, updated_at=None):
+        """Returns the (path, collection name) of the .blend converted from a model, or None"""
+        if not get_addon_preferences().useLibrary or get_addon_preferences().libraryImportMode == 'NONE':
+            return None
+
+        with ModelLibrary.lock:
+            blends = ModelLibrary.read_index(ModelLibrary.BLEND_INDEX_FILE)
+            entry = blends.get(uid)
+            if entry is None:
+                return None
+
+            blend_path = ModelLibrary.get_blend_path(uid)
+            if ModelLibrary.is_outdated(entry, updated_at) or not os.path.exists(blend_path):
+                ModelLibrary.remove(uid)
+                return None
+
+            entry['last_used'] = time.time()
+            ModelLibrary.write_index(blends, ModelLibrary.BLEND_INDEX_FILE)
+            return blend_path, entry['collection']
+
+    def add_blend(uid, filepath, collection, updated_at=None):
+        """Stores a .blend file containing the model in a collection"""
+        with ModelLibrary.lock:
+            blend_path = ModelLibrary.get_blend_path(uid)
+            os.makedirs(os.path.dirname(blend_path), exist_ok=True)
+            shutil.copyfile(filepath, blend_path)
+
+            blends = ModelLibrary.read_index(ModelLibrary.BLEND_INDEX_FILE)
+            blends[uid] = {
+                'collection': collection,
+                'size': os.path.getsize(blend_path),
+                'updated_at': updated_at,
+                'last_used': time.time(),
+            }
+            ModelLibrary.write_index(blends, ModelLibrary.BLEND_INDEX_FILE)
+            ModelLibrary.evict(get_addon_preferences().libraryQuota * 1024 * 1024)
+
+    def link_blend(uid, blend_path, updated_at=None):
+        """
+        Returns the path of a copy of a library .blend file that scenes can link:
+        the library files can be evicted, while this one stays
+        """
+        with ModelLibrary.lock:
+            linked_path = ModelLibrary.get_linked_path(uid, updated_at)
+            if not os.path.exists(linked_path):
+                os.makedirs(os.path.dirname(linked_path), exist_ok=True)
+                shutil.copyfile(blend_path, linked_path + '.tmp')
+                os.replace(linked_path + '.tmp', linked_path)
+            return linked_path
+
+    def write_blend(uid, title, objects, updated_at=None):
+        """Writes imported objects to a .blend file of the library, grouped in a collection"""
+        if not get_addon_preferences().useLibrary or get_addon_preferences().libraryImportMode == 'NONE':
+            return
+
+        # The objects stay in their current collections, this one is only written to the library
+        collection = bpy.data.collections.new(title)
+        try:
+            for ob in objects:
+                collection.objects.link(ob)
+            filepath = os.path.join(tempfile.mkdtemp(), '{}.blend'.format(uid))
+            bpy.data.libraries.write(filepath, {collection}, fake_user=True)
+            ModelLibrary.add_blend(uid, filepath, collection.name, updated_at)
+            shutil.rmtree(os.path.dirname(filepath), ignore_errors=True)
+        finally:
+            bpy.data.collections.remove(collection)
+
+    def remove(uid, directory=None):
+        with ModelLibrary.lock:
+            index = ModelLibrary.read_index(directory=directory)
+            entry = index.pop(uid, None)
+            if entry is not None:
+                ModelLibrary.write_index(index, directory=directory)
+                ModelLibrary.remove_unreferenced(entry['sha256'], index, directory)
+
+            blends = ModelLibrary.read_index(ModelLibrary.BLEND_INDEX_FILE, directory)
+            if blends.pop(uid, None) is not None:
+                ModelLibrary.write_index(blends, ModelLibrary.BLEND_INDEX_FILE, directory)
+                if os.path.exists(ModelLibrary.get_blend_path(uid, directory)):
+                    os.remove(ModelLibrary.get_blend_path(uid, directory))
+
+    def remove_unreferenced(digest, index, directory=None):
+        # Several uids can point to the same archive
+        if not any(e['sha256'] == digest for e in index.values()):
+            archive_path = ModelLibrary.get_archive_path(digest, directory)
+            if os.path.exists(archive_path):
+                os.remove(archive_path)
+
+    def get_size(index, blends):
+        sizes = {e['sha256']: e['size'] for e in index.values()}
+        return sum(sizes.values()) + sum(e['size'] for e in blends.values())
+
+    def evict(quota, directory=None):
+        with ModelLibrary.lock:
+            index = ModelLibrary.read_index(directory=directory)
+            blends = ModelLibrary.read_index(ModelLibrary.BLEND_INDEX_FILE, directory)
+            total_size = ModelLibrary.get_size(index, blends)
+
+            entries = [(e['last_used'], False, uid) for uid, e in index.items()]
+            entries += [(e['last_used'], True, uid) for uid, e in blends.items()]
+            evicted = 0
+            for last_used, is_blend, uid in sorted(entries):
+                if total_size <= quota:
+                    break
+                evicted += 1
+                if is_blend:
+                    total_size -= blends.pop(uid)['size']
+                    if os.path.exists(ModelLibrary.get_blend_path(uid, directory)):
+                        os.remove(ModelLibrary.get_blend_path(uid, directory))
+                else:
+                    entry = index.pop(uid)
+                    if not any(e['sha256'] == entry['sha256'] for e in index.values()):
+                        total_size -= entry['size']
+                        ModelLibrary.remove_unreferenced(entry['sha256'], index, directory)
+            if evicted:
+                ModelLibrary.write_index(index, directory=directory)
+                ModelLibrary.write_index(blends, ModelLibrary.BLEND_INDEX_FILE, directory)
+                print('Evicted {} file(s) from the library'.format(evicted))
+
+    def get_stats():
+        index = ModelLibrary.read_index()
+        blends = ModelLibrary.read_index(ModelLibrary.BLEND_INDEX_FILE)
+        return len(set(index) | set(blends)), ModelLibrary.get_size(index, blends)
+
+    def clear():
+        with ModelLibrary.lock:
+            directory = ModelLibrary.get_directory()
+            if not os.path.exists(directory):
+                return
+            for name in os.listdir(directory):
+                if name == ModelLibrary.LINKED_DIRECTORY:
+                    continue
+                path = os.path.join(directory, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
 
 
 # helpers
@@ -326,12 +1037,33 @@ def get_sketchfab_props():
 def get_sketchfab_props_proxy():
     return bpy.context.window_manager.sketchfab_browser_proxy
 
+def get_addon_preferences():
+    return bpy.context.preferences.addons[__name__.split('.')[0]].preferences
+
 def get_sketchfab_model(uid):
     skfb = get_sketchfab_props()
     if "current" in skfb.search_results and uid in skfb.search_results["current"]:
         return skfb.search_results['current'][uid]
     else:
-        return None
+        # Models of a batch can come from previous result pages
+        return batch_import.get_model(uid)
+
+def get_download_options(uid):
+    """
+    Settings used by the download and import threads, read on the main thread
+    as bpy data must not be accessed from other threads
+    """
+    skfb_model = get_sketchfab_model(uid)
+    preferences = get_addon_preferences()
+    return {
+        'updated_at': skfb_model.updated_at if skfb_model else None,
+        'library': ModelLibrary.get_directory() if preferences.useLibrary else None,
+        'library_quota': preferences.libraryQuota * 1024 * 1024,
+        'max_texture_size': int(get_sketchfab_props().max_texture_size),
+        'background_import': preferences.useBackgroundImport,
+        'blender_path': bpy.app.binary_path,
+        'import_workers': preferences.importWorkers,
+    }
 
 def run_default_search():
     searchthr = GetRequestThread(Config.DEFAULT_SEARCH, parse_results)
@@ -378,6 +1110,24 @@ def set_import_status(status):
     props.import_status = status
 
 
+# Worker threads must not touch bpy data directly: they queue functions
+# which are then executed on the main thread by a bpy.app.timers callback
+main_thread_queue = queue.Queue()
+
+def run_in_main_thread(function, *args, **kwargs):
+    main_thread_queue.put((function, args, kwargs))
+
+def execute_queued_functions():
+    while not main_thread_queue.empty():
+        function, args, kwargs = main_thread_queue.get()
+        try:
+            function(*args, **kwargs)
+        except Exception:
+            import traceback
+            traceback.print_exc()
+    return Config.PROGRESS_UPDATE_INTERVAL
+
+
 class SketchfabApi:
     def __init__(self):
         self.access_token = ''
@@ -630,18 +1380,51 @@ class SketchfabApi:
 
     def download_model(self, uid):
         skfb_model = get_sketchfab_model(uid)
+        updated_at = skfb_model.updated_at if skfb_model else None
+        start_import_profile(uid, skfb_model.title if skfb_model else "Sketchfab Model")
+
+        # The model was already imported, reuse the converted .blend file
+        library_blend = ModelLibrary.get_blend(uid, updated_at)
+        if library_blend is not None:
+            if skfb_model is not None:
+                self.write_model_info(skfb_model.title, skfb_model.author, skfb_model.username, skfb_model.license, uid)
+            begin_import_profile(uid)
+            time_start = time.perf_counter()
+            blend_path, collection_name = library_blend
+            link = get_addon_preferences().libraryImportMode == 'LINK'
+            if link:
+                blend_path = ModelLibrary.link_blend(uid, blend_path, updated_at)
+            objects = import_library_blend(blend_path, collection_name, link)
+            add_import_step(uid, 'import', time.perf_counter() - time_start)
+            finish_import(uid, skfb_model.title if skfb_model else library_blend[1], objects)
+            return
+
+        # The archive was already downloaded, skip the network
+        library_path = ModelLibrary.get(uid, updated_at)
+        if library_path is not None:
+            if skfb_model is not None:
+                self.write_model_info(skfb_model.title, skfb_model.author, skfb_model.username, skfb_model.license, uid)
+            title = skfb_model.title if skfb_model else ModelLibrary.read_index().get(uid, {}).get('title', "Sketchfab Model")
+            library_thread = threading.Thread(target=self.extract_library_archive, args=(uid, title, library_path, get_download_options(uid)))
+            library_thread.start()
+            return
+
         if skfb_model is not None: # The model comes from the search results
-            if skfb_model.download_url and (time.time() - skfb_model.time_url_requested < skfb_model.url_expires):
-                self.get_archive(skfb_model.download_url)
+            self.write_model_info(skfb_model.title, skfb_model.author, skfb_model.username, skfb_model.license, uid)
+            org_uid = self.active_org["uid"] if self.use_org_profile and self.active_org else ""
+
+            # Reuse the signed url until shortly before it expires
+            if not skfb_model.is_download_url_valid():
+                skfb_model.set_download(DownloadUrlCache.get(uid, org_uid))
+            if skfb_model.is_download_url_valid():
+                self.get_archive(skfb_model.download_url, skfb_model.title, get_download_options(uid))
             else:
-                skfb_model.download_url = None
-                skfb_model.url_expires = None
-                skfb_model.time_url_requested = None
-                self.write_model_info(skfb_model.title, skfb_model.author, skfb_model.username, skfb_model.license, uid)
+                skfb_model.set_download(None)
                 requests.get(Utils.build_download_url(uid, self.use_org_profile, self.active_org), headers=self.headers, hooks={'response': self.handle_download})
         else: # Model comes from a direct link
             skfb = get_sketchfab_props()
             download_url = ""
+            orgUid = ""
 
             # If the model is in an org, find if the user has access to it
             if "/orgs/" in skfb.manualImportPath:
@@ -651,7 +1434,6 @@ class SketchfabApi:
                         skfb.skfb_api.request_user_orgs()
 
                     user_orgs = skfb.skfb_api.user_orgs
-                    orgUid = ""
                     for org in user_orgs:
                         if org["username"] == orgName:
                             orgUid = org["uid"]
@@ -669,73 +1451,586 @@ class SketchfabApi:
                 download_url = Utils.build_download_url(uid)
                 requests.get('{}/{}'.format(Config.SKETCHFAB_MODEL, uid), headers=skfb.skfb_api.headers, hooks={'response': self.parse_model_info_request})
 
-            requests.get(download_url, headers=self.headers, hooks={'response': self.handle_download})
+            download = DownloadUrlCache.get(uid, orgUid)
+            if download is not None:
+                self.get_archive(download["url"], "Sketchfab Model", get_download_options(uid))
+            else:
+                requests.get(download_url, headers=self.headers, hooks={'response': self.handle_download})
 
     def handle_download(self, r, *args, **kwargs):
         if r.status_code != 200 or 'gltf' not in r.json():
+            uid = Utils.get_uid_from_model_url(r.url, "/orgs/" in r.url)
+            if uid is not None:
+                batch_import.set_state(uid, 'FAILED')
             ShowMessage("ERROR", "This model is not downloadable", "Make sure your account has enough rights to download the model")
             return
 
         skfb = get_sketchfab_props()
-        uid = Utils.get_uid_from_model_url(r.url, self.use_org_profile)
+        uid = Utils.get_uid_from_model_url(r.url, "/orgs/" in r.url)
         if uid is None:
             return
 
         gltf = r.json()['gltf']
+        download = DownloadUrlCache.save(uid, Utils.get_org_uid_from_model_url(r.url), gltf)
         skfb_model = get_sketchfab_model(uid)
+        if skfb_model is not None:
+            skfb_model.set_download(download)
 
         # If the model name is not known at this step, we could try to do an additional API call to get it
         # This can happen when the user chose to import a model from its url
         # However this adds an additional call and a bit of complexity for org models (need additional parsing),
         # so for a simple hotfix models imported this way will be called "Sketchfab model"
-        self.get_archive(gltf['url'], skfb_model.title if skfb_model else "Sketchfab Model")
+        self.get_archive(gltf['url'], skfb_model.title if skfb_model else "Sketchfab Model", get_download_options(uid))
 
-    def get_archive(self, url, title):
+    def get_archive(self, url, title, options):
         if url is None:
             print('Url is None')
             return
 
-        r = requests.get(url, stream=True)
+        # Download and unzip in a worker thread, the import itself is sent back to the main thread
+        download_thread = threading.Thread(target=self.download_archive, args=(url, title, options))
+        download_thread.start()
+
+    def download_archive(self, url, title, options):
         uid = Utils.get_uid_from_download_url(url)
+        try:
+            self.download_and_extract(url, uid, title, options)
+        except Exception:
+            # The main thread must hear about the failure, or the import would never end
+            import traceback
+            print(traceback.format_exc())
+            run_in_main_thread(on_download_error, uid)
+
+    def download_and_extract(self, url, uid, title, options):
         temp_dir = os.path.join(Config.SKETCHFAB_MODEL_DIR, uid)
         if not os.path.exists(temp_dir):
             os.makedirs(temp_dir)
 
         archive_path = os.path.join(temp_dir, '{}.zip'.format(uid))
-        if not os.path.exists(archive_path):
-            wm = bpy.context.window_manager
-            wm.progress_begin(0, 100)
-            set_log("Downloading model..")
-            with open(archive_path, "wb") as f:
-                total_length = r.headers.get('content-length')
-                if total_length is None:  # no content length header
-                    f.write(r.content)
-                else:
-                    dl = 0
-                    total_length = int(total_length)
-                    for data in r.iter_content(chunk_size=4096):
-                        dl += len(data)
-                        f.write(data)
-                        done = int(100 * dl / total_length)
-                        wm.progress_update(done)
-                        set_log("Downloading model..{}%".format(done))
-
-            wm.progress_end()
-        else:
-            print('Model already downloaded')
 
-        gltf_path, gltf_zip = unzip_archive(archive_path)
-        if gltf_path:
+        # Corrupt or truncated archives are deleted and fetched again
+        for attempt in range(Config.DOWNLOAD_MAX_ATTEMPTS):
+            extracted = False
+            if Utils.is_archive_valid(archive_path):
+                print('Model already downloaded')
+            else:
+                Utils.remove_archive(archive_path)
+                downloaded, extracted = self.fetch_archive(url, archive_path)
+                if not downloaded:
+                    continue
+
+            if batch_import.is_failed(uid):
+                print('Import of {} cancelled'.format(title))
+                return
+            run_in_main_thread(batch_import.set_state, uid, 'PREPARING')
+            time_start = time.perf_counter()
+            gltf_path, gltf_zip = unzip_archive(archive_path, extracted)
+            add_import_step(uid, 'unzip', time.perf_counter() - time_start)
+            if gltf_path:
+                if options['library'] is not None:
+                    ModelLibrary.add(uid, title, archive_path, options['updated_at'], options['library'], options['library_quota'])
+                queue_import(gltf_path, uid, title, options)
+                return
+
+        run_in_main_thread(on_download_error, uid)
+
+    def extract_library_archive(self, uid, title, library_path, options):
+        try:
+            temp_dir = os.path.join(Config.SKETCHFAB_MODEL_DIR, uid)
+            if not os.path.exists(temp_dir):
+                os.makedirs(temp_dir)
+
+            run_in_main_thread(batch_import.set_state, uid, 'PREPARING')
+            time_start = time.perf_counter()
+            gltf_path, gltf_zip = unzip_archive(library_path, extract_dir=temp_dir)
+            add_import_step(uid, 'unzip', time.perf_counter() - time_start)
+            if gltf_path:
+                print('Model imported from the library')
+                queue_import(gltf_path, uid, title, options)
+            else:
+                # Invalid archive, download it again
+                ModelLibrary.remove(uid, options['library'])
+                run_in_main_thread(self.download_model, uid)
+        except Exception:
+            import traceback
+            print(traceback.format_exc())
+            run_in_main_thread(on_download_error, uid)
+
+    def fetch_archive(self, url, archive_path):
+        """
+        Downloads the archive and records its size and hash next to it, while
+        extracting its entries as soon as they are received.
+        Returns (downloaded, extracted), downloaded being False if the download
+        failed or is incomplete, and extracted False if the archive still needs
+        to be unzipped
+        """
+        run_in_main_thread(begin_download_progress)
+        uid = Utils.get_uid_from_download_url(url)
+        extractor = StreamingZipExtractor(os.path.dirname(archive_path))
+        extractor.start()
+        try:
+            with transfer_scheduler.transfer('IMPORT') as transfer:
+                r = requests.get(url, stream=True)
+                download = StreamingDownload(
+                    r,
+                    archive_path,
+                    on_progress=lambda downloaded, total_length: publish_download_progress(downloaded, total_length, uid),
+                    initial_throughput=transfer_scheduler.measured_throughput,
+                    on_data=extractor.feed,
+                    transfer=transfer
+                )
+                download.run()
+        except requests.exceptions.RequestException as e:
+            print('Error when downloading model: {}'.format(e))
+            Utils.remove_archive(archive_path)
+            return False, False
+        finally:
+            extractor.close()
+            run_in_main_thread(end_download_progress)
+
+        if download.total_length and download.size != download.total_length:
+            print('Incomplete download: {} out of {} bytes'.format(download.size, download.total_length))
+            Utils.remove_archive(archive_path)
+            return False, False
+
+        Utils.write_archive_record(archive_path, download.size, download.digest)
+        add_import_step(uid, 'download', download.elapsed)
+        run_in_main_thread(Cache.save_key, 'download_throughput', download.throughput)
+        transfer_scheduler.measured_throughput = download.throughput
+        print('Downloaded {} in {:.2f}s ({}/s)'.format(
+            Utils.humanify_size(download.size),
+            download.elapsed,
+            Utils.humanify_size(download.throughput)
+        ))
+        return True, extractor.validate(archive_path)
+
+class TransferScheduler:
+    """
+    Shares the bandwidth between transfer classes (see Config.TRANSFER_CLASSES).
+    The rate limit is the one set in the addon preferences. Without one, the
+    throughput measured on previous downloads is used as the link capacity,
+    but only while several classes are active so a lone transfer is never slowed
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bandwidth_limit = 0
+        self.measured_throughput = Cache.get_key('download_throughput') or 0
+        self.semaphores = {qos: threading.Semaphore(c['concurrency']) for qos, c in Config.TRANSFER_CLASSES.items()}
+        self.active = {qos: 0 for qos in Config.TRANSFER_CLASSES}
+        self.buckets = {qos: {'tokens': 0.0, 'time': time.perf_counter()} for qos in Config.TRANSFER_CLASSES}
+
+    def transfer(self, qos):
+        return Transfer(self, qos)
+
+    def begin(self, qos):
+        self.semaphores[qos].acquire()
+        with self.lock:
+            self.active[qos] += 1
+
+    def end(self, qos):
+        with self.lock:
+            self.active[qos] -= 1
+        self.semaphores[qos].release()
+
+    def get_rate(self, qos):
+        active_shares = sum(Config.TRANSFER_CLASSES[q]['share'] for q, n in self.active.items() if n)
+        limit = self.bandwidth_limit
+        if not limit and active_shares > Config.TRANSFER_CLASSES[qos]['share']:
+            limit = self.measured_throughput
+        if not limit or not active_shares:
+            return 0
+        return limit * Config.TRANSFER_CLASSES[qos]['share'] / active_shares
+
+    def consume(self, qos, nbytes):
+        """Accounts for nbytes transferred in a class, and sleeps if the class is above its rate"""
+        with self.lock:
+            rate = self.get_rate(qos)
+            bucket = self.buckets[qos]
+            now = time.perf_counter()
+            if rate:
+                bucket['tokens'] = min(rate * Config.TRANSFER_BURST, bucket['tokens'] + (now - bucket['time']) * rate)
+                bucket['tokens'] -= nbytes
+            bucket['time'] = now
+            delay = -bucket['tokens'] / rate if rate and bucket['tokens'] < 0 else 0
+        if delay:
+            time.sleep(delay)
+
+
+class Transfer:
+    """A transfer slot in a TransferScheduler class, used as a context manager"""
+    def __init__(self, scheduler, qos):
+        self.scheduler = scheduler
+        self.qos = qos
+
+    def __enter__(self):
+        self.scheduler.begin(self.qos)
+        return self
+
+    def __exit__(self, *args):
+        self.scheduler.end(self.qos)
+
+    def consume(self, nbytes):
+        self.scheduler.consume(self.qos, nbytes)
+
+transfer_scheduler = TransferScheduler()
+
+def updateBandwidthLimit(self, context):
+    transfer_scheduler.bandwidth_limit = get_addon_preferences().bandwidthLimit * 1024 * 1024
+
+
+class StreamingDownload:
+    """
+    Streams the body of a response to a file through a large buffered writer.
+    The size of each read grows or shrinks with the measured throughput, and
+    progress callbacks are throttled to Config.PROGRESS_UPDATE_INTERVAL
+    """
+    def __init__(self, response, filepath, on_progress=None, initial_throughput=0, on_data=None, transfer=None):
+        self.response = response
+        self.filepath = filepath
+        self.on_progress = on_progress
+        self.on_data = on_data
+        self.transfer = transfer
+        self.total_length = int(response.headers.get('content-length') or 0)
+        self.chunk_size = self.get_chunk_size(initial_throughput)
+
+        self.size = 0
+        self.elapsed = 0.0
+        self.throughput = 0.0
+        self.hash = hashlib.sha256()
+
+    @property
+    def digest(self):
+        return self.hash.hexdigest()
+
+    def get_chunk_size(self, throughput):
+        chunk_size = int(throughput * Config.DOWNLOAD_READ_INTERVAL)
+        return max(Config.DOWNLOAD_MIN_CHUNK_SIZE, min(Config.DOWNLOAD_MAX_CHUNK_SIZE, chunk_size))
+
+    def run(self):
+        self.response.raise_for_status()
+
+        start = last_progress = time.perf_counter()
+        throughput = 0.0
+        with open(self.filepath, 'wb', buffering=Config.DOWNLOAD_WRITE_BUFFER_SIZE) as f:
+            while True:
+                read_start = time.perf_counter()
+                data = self.response.raw.read(self.chunk_size, decode_content=True)
+                if not data:
+                    break
+                now = time.perf_counter()
+                f.write(data)
+                if self.on_data:
+                    self.on_data(data)
+                self.hash.update(data)
+                self.size += len(data)
+                if self.transfer:
+                    self.transfer.consume(len(data))
+
+                # Smooth the throughput measured on this read, and adapt the next read size
+                measured = len(data) / max(now - read_start, 1e-6)
+                throughput = measured if not throughput else 0.7 * throughput + 0.3 * measured
+                self.chunk_size = min(2 * self.chunk_size, self.get_chunk_size(throughput))
+
+                if self.on_progress and now - last_progress >= Config.PROGRESS_UPDATE_INTERVAL:
+                    last_progress = now
+                    self.on_progress(self.size, self.total_length)
+
+        self.elapsed = time.perf_counter() - start
+        self.throughput = self.size / self.elapsed if self.elapsed > 0 else 0.0
+        if self.on_progress:
+            self.on_progress(self.size, self.total_length)
+        return self.size
+
+class StreamingZipExtractor:
+    """
+    Extracts a zip archive while it is being downloaded, by parsing the local
+    file headers of the received bytes in a separate thread.
+    Stored and deflated entries are supported, anything else (encryption,
+    other compression methods...) stops the streaming extraction and the
+    archive is then unzipped normally once downloaded.
+    """
+    LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+    LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+    DESCRIPTOR_SIGNATURE = b'PK\x07\x08'
+
+    def __init__(self, extract_dir):
+        self.extract_dir = extract_dir
+        self.queue = queue.Queue(maxsize=64)
+        self.thread = threading.Thread(target=self.run)
+
+        self.buffer = bytearray()
+        self.failed = False
+        self.finished = False
+        self.entries = {}
+
+        # Once scene.gltf is extracted, only the files it references are written
+        self.references = None
+        self.skipped = []
+
+        self.entry = None
+        self.file = None
+        self.decompressor = None
+
+    def start(self):
+        self.thread.start()
+
+    def feed(self, data):
+        if not self.failed and not self.finished:
+            self.queue.put(data)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def run(self):
+        while True:
+            data = self.queue.get()
+            if data is None:
+                break
+            if self.failed or self.finished:
+                continue
+            self.buffer += data
             try:
-                import_model(gltf_path, uid, title)
+                while self.parse():
+                    pass
             except Exception as e:
-                import traceback
-                print(traceback.format_exc())
+                # Any error falls back to a normal unzip, the download must not wait on a dead thread
+                self.fail('{}'.format(e))
+
+    def fail(self, reason):
+        print('Streaming extraction stopped: {}'.format(reason))
+        self.failed = True
+        self.buffer = bytearray()
+
+
+    def parse(self):
+        """Consumes the buffer as far as possible, returns True to be called again"""
+        if self.entry is None:
+            return self.parse_header()
+        elif self.entry['remaining'] is not None or self.decompressor is not None:
+            return self.parse_data()
         else:
-            ShowMessage("ERROR", "Download error", "Failed to download model (url might be invalid)")
-            model = get_sketchfab_model(uid)
-            set_import_status("Import model ({})".format(model.download_size if model.download_size else 'fetching data'))
-        return
+            return self.parse_descriptor()
+
+    def parse_header(self):
+        if len(self.buffer) < 4:
+            return False
+        if self.buffer[:4] != StreamingZipExtractor.LOCAL_HEADER_SIGNATURE:
+            # Central directory reached, every entry was extracted
+            self.finished = True
+            self.buffer = bytearray()
+            return False
+        if len(self.buffer) < StreamingZipExtractor.LOCAL_HEADER.size:
+            return False
+
+        (_, _, flags, method, _, _, crc, compressed_size, size, name_length, extra_length
+        ) = StreamingZipExtractor.LOCAL_HEADER.unpack_from(self.buffer)
+        header_length = StreamingZipExtractor.LOCAL_HEADER.size + name_length + extra_length
+        if len(self.buffer) < header_length:
+            return False
+
+        name = bytes(self.buffer[30:30 + name_length])
+        name = name.decode('utf-8') if flags & 0x800 else name.decode('cp437')
+        extra = bytes(self.buffer[30 + name_length:header_length])
+        del self.buffer[:header_length]
+
+        # Zip64 entries store their sizes in an extra field
+        zip64 = False
+        while len(extra) >= 4:
+            field_id, field_length = struct.unpack_from('<2H', extra)
+            if field_id == 0x0001:
+                zip64 = True
+                values = list(struct.unpack_from('<{}Q'.format(field_length // 8), extra, 4))
+                if size == 0xFFFFFFFF and values:
+                    size = values.pop(0)
+                if compressed_size == 0xFFFFFFFF and values:
+                    compressed_size = values.pop(0)
+            extra = extra[4 + field_length:]
+
+        has_descriptor = bool(flags & 0x08)
+        if flags & 0x01:
+            self.fail('encrypted entry {}'.format(name))
+            return False
+        if method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            self.fail('unsupported compression method for {}'.format(name))
+            return False
+        if method == zipfile.ZIP_STORED and has_descriptor:
+            self.fail('stored entry {} has no size'.format(name))
+            return False
+
+        self.entry = {
+            'name': name,
+            'crc': None if has_descriptor else crc,
+            'size': None if has_descriptor else size,
+            'remaining': None if has_descriptor else compressed_size,
+            'zip64': zip64,
+            'computed_crc': 0,
+            'computed_size': 0,
+        }
+        self.decompressor = zlib.decompressobj(-15) if method == zipfile.ZIP_DEFLATED else None
+
+        target_path = Utils.get_extract_path(self.extract_dir, name)
+        if target_path is None or name.endswith('/'):
+            if target_path is not None:
+                os.makedirs(target_path, exist_ok=True)
+        elif self.references is not None and name not in self.references:
+            # Still inflated to check its CRC, but not written
+            self.skipped.append(name)
+        else:
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            self.entry['path'] = target_path
+            self.file = open(target_path, 'wb', buffering=Config.DOWNLOAD_WRITE_BUFFER_SIZE)
+        return True
+
+    def write(self, data):
+        if data:
+            self.entry['computed_crc'] = zlib.crc32(data, self.entry['computed_crc'])
+            self.entry['computed_size'] += len(data)
+            if self.file is not None:
+                self.file.write(data)
+
+    def parse_data(self):
+        entry = self.entry
+        if not self.buffer and entry['remaining'] != 0:
+            return False
+
+        if entry['remaining'] is not None:
+            data = bytes(self.buffer[:entry['remaining']])
+            del self.buffer[:len(data)]
+            entry['remaining'] -= len(data)
+            self.write(self.decompressor.decompress(data) if self.decompressor else data)
+            if entry['remaining']:
+                return False
+            if self.decompressor:
+                self.write(self.decompressor.flush())
+            self.end_entry()
+            return True
+
+        # Deflated entry followed by a data descriptor: the end of the entry
+        # is found when the deflate stream ends
+        data = bytes(self.buffer)
+        self.buffer = bytearray()
+        self.write(self.decompressor.decompress(data))
+        if not self.decompressor.eof:
+            return False
+        self.buffer = bytearray(self.decompressor.unused_data)
+        self.decompressor = None
+        return True
+
+    def parse_descriptor(self):
+        entry = self.entry
+        has_signature = self.buffer[:4] == StreamingZipExtractor.DESCRIPTOR_SIGNATURE
+        sizes_format = '<LQQ' if entry['zip64'] else '<LLL'
+        length = (4 if has_signature else 0) + struct.calcsize(sizes_format)
+        if len(self.buffer) < length:
+            return False
+        entry['crc'], _, entry['size'] = struct.unpack_from(sizes_format, self.buffer, 4 if has_signature else 0)
+        del self.buffer[:length]
+        self.end_entry()
+        return True
+
+    def end_entry(self):
+        entry = self.entry
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.entry = None
+        self.decompressor = None
+
+        if entry['crc'] != entry['computed_crc'] or entry['size'] != entry['computed_size']:
+            self.fail('bad CRC or size for {}'.format(entry['name']))
+            return
+        self.entries[entry['name']] = (entry['crc'], entry['size'])
+
+        if entry['name'] == 'scene.gltf' and entry.get('path'):
+            with open(entry['path'], 'rb') as f:
+                self.references = Utils.get_gltf_references(f.read())
+
+    def validate(self, archive_path):
+        """
+        Checks the extracted entries against the central directory of the
+        downloaded archive. Returns True if the archive was fully extracted
+        """
+        if self.failed or not self.finished:
+            return False
+        if self.skipped:
+            print('Skipped {} unreferenced file(s): {}'.format(len(self.skipped), ', '.join(self.skipped)))
+        try:
+            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+                for info in zip_ref.infolist():
+                    if self.entries.get(info.filename) != (info.CRC, info.file_size):
+                        print('Streaming extraction mismatch for {}'.format(info.filename))
+                        return False
+        except zipfile.BadZipFile:
+            return False
+        return True
+
+
+def begin_download_progress():
+    bpy.context.window_manager.progress_begin(0, 100)
+    set_log("Downloading model..")
+
+def publish_download_progress(downloaded, total_length, uid=None):
+    # Called from the download thread, the UI is updated on the main thread
+    if total_length:
+        run_in_main_thread(update_download_progress, int(100 * downloaded / total_length))
+    if uid is not None:
+        run_in_main_thread(batch_import.set_progress, uid, downloaded, total_length)
+
+def update_download_progress(done):
+    bpy.context.window_manager.progress_update(done)
+    if not batch_import.is_running():
+        set_log("Downloading model..{}%".format(done))
+
+def end_download_progress():
+    bpy.context.window_manager.progress_end()
+
+def on_download_error(uid):
+    batch_import.set_state(uid, 'FAILED')
+    ShowMessage("ERROR", "Download error", "Failed to download model (url might be invalid)")
+    model = get_sketchfab_model(uid)
+    download_size = model.download_size if model is not None else None
+    set_import_status("Import model ({})".format(download_size if download_size else 'fetching data'))
+
+class DownloadUrlCache:
+    """
+    Signed download urls returned by the /download endpoint, stored per uid and
+    org in the plugin cache so they are reused across searches and sessions
+    """
+    CACHE_KEY = 'download_urls'
+
+    def get_key(uid, org_uid=""):
+        return '{}/{}'.format(org_uid, uid) if org_uid else uid
+
+    def get(uid, org_uid=""):
+        download = (Cache.get_key(DownloadUrlCache.CACHE_KEY) or {}).get(DownloadUrlCache.get_key(uid, org_uid))
+        if download is None:
+            return None
+        if time.time() >= download['time_requested'] + download['expires'] - Config.DOWNLOAD_URL_EXPIRY_MARGIN:
+            return None
+        return download
+
+    def save(uid, org_uid, gltf):
+        now = time.time()
+        download = {
+            'url': gltf['url'],
+            'size': gltf.get('size'),
+            'expires': gltf.get('expires', 0),
+            'time_requested': now,
+        }
+
+        # Drop the expired urls while we are at it
+        downloads = {
+            key: value for key, value in (Cache.get_key(DownloadUrlCache.CACHE_KEY) or {}).items()
+            if value['time_requested'] + value['expires'] > now
+        }
+        downloads[DownloadUrlCache.get_key(uid, org_uid)] = download
+        Cache.save_key(DownloadUrlCache.CACHE_KEY, downloads)
+        return download
+
 
 class SketchfabLoginProps(bpy.types.PropertyGroup):
     def update_tr(self, context):
@@ -1030,6 +2325,32 @@ class SketchfabBrowserProps(bpy.types.PropertyGroup):
 
     import_status : StringProperty(name='import', default='')
 
+    # Import options
+    expanded_import_options : BoolProperty(default=False)
+    deduplicate_meshes : BoolProperty(
+            name="Share identical meshes",
+            description="Use a single mesh for the objects having the same geometry",
+            default=True,
+            )
+    face_budget : IntProperty(
+            name="Face budget",
+            description="Decimate the heavy meshes so that the imported model has at most this number of faces (0 for no limit)",
+            default=0,
+            min=0,
+            )
+    generate_lods : BoolProperty(
+            name="Generate LODs",
+            description="Add decimated copies of the model ({}) in one collection per level of detail".format(
+                "/".join("{}%".format(int(r * 100)) for r in Config.LOD_RATIOS)),
+            default=False,
+            )
+    max_texture_size : EnumProperty(
+            name="Max texture size",
+            items=Config.SKETCHFAB_TEXTURE_SIZES,
+            description="Downscale larger textures before importing the model",
+            default='0',
+            )
+
     manualImportBoolean : BoolProperty(
             name="Import from url",
             description="Import a downloadable model from a url",
@@ -1124,23 +2445,54 @@ def draw_import_button(layout, model, context):
     import_ops.scale_y = 2.0
     import_ops.operator("wm.sketchfab_download", icon=download_icon, text=downloadlabel, translate=False, emboss=True).model_uid = model.uid
 
+def draw_batch_import(layout, model, context):
+    skfb = get_sketchfab_props()
+
+    col = layout.box().column(align=True)
+    col.enabled = skfb.skfb_api.is_user_logged() and bpy.context.mode == 'OBJECT' and not batch_import.is_running()
+    row = col.row(align=True)
+    selected = model.uid in batch_import.selection
+    row.operator("wm.sketchfab_batch_select", text="Remove from batch" if selected else "Add to batch",
+                 icon='REMOVE' if selected else 'ADD').model_uid = model.uid
+    row.operator("wm.sketchfab_batch_select", text="Add page", icon='IMGDISPLAY').action = 'ALL'
+    if batch_import.selection:
+        row = col.row(align=True)
+        row.operator("wm.sketchfab_batch_import", text="Import {} models".format(len(batch_import.selection)), icon='IMPORT')
+        row.operator("wm.sketchfab_batch_select", text="", icon='X').action = 'CLEAR'
+
+def draw_import_options(layout, context, model=None):
+    skfb = get_sketchfab_props()
+
+    col = layout.box().column(align=True)
+    row = col.row()
+    row.prop(skfb, "expanded_import_options", icon="TRIA_DOWN" if skfb.expanded_import_options else "TRIA_RIGHT", icon_only=True, emboss=False)
+    row.label(text="Import options")
+    if skfb.expanded_import_options:
+        col.separator()
+        col.prop(skfb, "deduplicate_meshes")
+        col.prop(skfb, "max_texture_size")
+        col.prop(skfb, "face_budget")
+        face_count = getattr(model, 'face_count', None)
+        if skfb.face_budget and face_count and face_count > skfb.face_budget:
+            col.label(text='Heavy meshes will be reduced to about {}%'.format(max(1, int(100 * skfb.face_budget / face_count))), icon='MOD_DECIM')
+        col.prop(skfb, "generate_lods")
+
 def set_log(log):
     get_sketchfab_props().status = log
 
-def unzip_archive(archive_path):
+def unzip_archive(archive_path, extracted=False, extract_dir=None):
     if os.path.exists(archive_path):
-        set_import_status('Unzipping model')
-        import zipfile
+        extract_dir = extract_dir or os.path.dirname(archive_path)
         try:
-            zip_ref = zipfile.ZipFile(archive_path, 'r')
-            extract_dir = os.path.dirname(archive_path)
-            zip_ref.extractall(extract_dir)
-            zip_ref.close()
-        except zipfile.BadZipFile:
+            # The archive might already have been extracted while downloading
+            if not extracted:
+                run_in_main_thread(set_import_status, 'Unzipping model')
+                extract_archive(archive_path, extract_dir, get_referenced_members(archive_path))
+        except (zipfile.BadZipFile, zlib.error):
             print('Error when dezipping file')
-            os.remove(archive_path)
+            Utils.remove_archive(archive_path)
             print('Invaild zip. Try again')
-            set_import_status('')
+            run_in_main_thread(set_import_status, '')
             return None, None
 
         gltf_file = os.path.join(extract_dir, 'scene.gltf')
@@ -1148,6 +2500,238 @@ def unzip_archive(archive_path):
 
     else:
         print('ERROR: archive doesn\'t exist')
+        return None, None
+
+
+def queue_import(gltf_path, uid, title, options):
+    """
+    Prepares the extracted files in the current (worker) thread, and sends the
+    import to the main thread
+    """
+    max_texture_size = options['max_texture_size']
+    if max_texture_size and not batch_import.is_failed(uid):
+        run_in_main_thread(set_import_status, 'Resizing textures')
+        time_start = time.perf_counter()
+        remaining = downscale_textures(gltf_path, max_texture_size)
+        if remaining:
+            remaining = downscale_textures_in_background(remaining, options['blender_path'], options['import_workers'])
+        if remaining:
+            from . import downscale_in_background
+            run_in_main_thread(downscale_in_background.downscale_textures, remaining)
+        add_import_step(uid, 'textures', time.perf_counter() - time_start)
+    if batch_import.is_failed(uid):
+        print('Import of {} cancelled'.format(title))
+        return
+    run_in_main_thread(batch_import.set_state, uid, 'IMPORTING')
+    if options['background_import']:
+        run_in_main_thread(import_worker_pool.submit, gltf_path, uid, title)
+    else:
+        run_in_main_thread(import_model, gltf_path, uid, title)
+
+
+def get_image_size(filepath):
+    """Reads the dimensions of a PNG or JPEG file from its header, or returns None"""
+    try:
+        with open(filepath, 'rb') as f:
+            header = f.read(24)
+            if header[:8] == b'\x89PNG\r\n\x1a\n' and header[12:16] == b'IHDR':
+                return struct.unpack('>2L', header[16:24])
+
+            if header[:2] == b'\xff\xd8':
+                f.seek(2)
+                while True:
+                    marker = f.read(2)
+                    if len(marker) < 2 or marker[0] != 0xFF:
+                        return None
+                    if marker[1] in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+                        height, width = struct.unpack('>3x2H', f.read(7))
+                        return width, height
+                    length, = struct.unpack('>H', f.read(2))
+                    f.seek(length - 2, 1)
+    except (OSError, struct.error):
+        pass
+    return None
+
+
+def get_downscaled_size(size, max_size):
+    width, height = size
+    scale = max_size / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def downscale_textures(gltf_path, max_size):
+    """
+    Downscales the images referenced by a glTF file so that their largest side
+    fits in max_size, keeping their aspect ratio, format and color profile.
+    Uses Pillow in a pool of threads when it is available, otherwise returns
+    the list of (path, size) left to be resized by Blender
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with open(gltf_path, 'rb') as f:
+        gltf = json.loads(f.read())
+
+    oversized = []
+    for image in gltf.get('images', []):
+        uri = image.get('uri')
+        if not uri or uri.startswith('data:'):
+            continue
+        path = os.path.join(os.path.dirname(gltf_path), urllib.parse.unquote(uri))
+        size = get_image_size(path)
+        if size is not None and max(size) > max_size:
+            oversized.append((path, get_downscaled_size(size, max_size)))
+
+    if not oversized:
+        return []
+
+    try:
+        from PIL import Image
+    except ImportError:
+        return oversized
+
+    def downscale(path, size):
+        with Image.open(path) as img:
+            image_format = img.format
+            save_options = {}
+            if img.info.get('icc_profile'):
+                save_options['icc_profile'] = img.info['icc_profile']
+            if image_format == 'JPEG':
+                save_options['quality'] = 95
+            resized = img.resize(size, Image.LANCZOS)
+        resized.save(path, format=image_format, **save_options)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=Config.EXTRACT_WORKERS) as executor:
+        for future in [executor.submit(downscale, *o) for o in oversized]:
+            future.result()
+    print('Downscaled {} texture(s) to {}px in {:.2f}s'.format(len(oversized), max_size, time.perf_counter() - start))
+    return []
+
+
+def downscale_textures_in_background(oversized, blender_path, max_processes):
+    """
+    Resizes textures in background Blender processes, so that the interface
+    stays responsive without Pillow. The images are split across up to
+    max_processes processes, started at the same time. Returns the list of
+    (path, size) that could not be resized
+    """
+    if not blender_path:
+        return oversized
+
+    # largest images first, dealt in turn so that the processes get similar work
+    oversized = sorted(oversized, key=lambda o: o[1][0] * o[1][1], reverse=True)
+    count = min(max_processes, len(oversized))
+    batches = [oversized[i::count] for i in range(count)]
+
+    script_path = os.path.dirname(os.path.realpath(__file__))
+    tempdirs = []
+    processes = []
+    remaining = []
+    start = time.perf_counter()
+    try:
+        for batch in batches:
+            tempdir = tempfile.mkdtemp()
+            tempdirs.append(tempdir)
+            with open(os.path.join(tempdir, "downscale-sketchfab.json"), 'w') as s:
+                json.dump({"oversized": batch}, s)
+            try:
+                processes.append((batch, subprocess.Popen([
+                        blender_path,
+                        "--background",
+                        "-noaudio",
+                        "--factory-startup",
+                        "--python", os.path.join(script_path, "downscale_in_background.py"),
+                        "--", tempdir
+                        ])))
+            except OSError as e:
+                print('Could not start Blender to resize textures: {}'.format(e))
+                remaining += batch
+
+        for batch, process in processes:
+            if process.wait() != 0:
+                remaining += batch
+    finally:
+        for tempdir in tempdirs:
+            shutil.rmtree(tempdir, ignore_errors=True)
+
+    print('Downscaled {} texture(s) in {} background process(es) in {:.2f}s'.format(
+        len(oversized) - len(remaining), len(processes), time.perf_counter() - start))
+    return remaining
+
+
+def get_referenced_members(archive_path):
+    """
+    Reads scene.gltf from the archive and returns the members it references,
+    so that unused files (licenses, alternate textures...) are not extracted.
+    Returns None (extract everything) if scene.gltf is missing or invalid
+    """
+    with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+        try:
+            references = Utils.get_gltf_references(zip_ref.read('scene.gltf'))
+        except KeyError:
+            return None
+        if references is None:
+            return None
+
+        infos = zip_ref.infolist()
+        members = [info for info in infos if info.filename in references]
+        skipped = [info for info in infos if info.filename not in references and not info.is_dir()]
+
+    if skipped:
+        print('Skipped {} unreferenced file(s) ({}): {}'.format(
+            len(skipped),
+            Utils.humanify_size(sum(info.file_size for info in skipped)),
+            ', '.join(info.filename for info in skipped)))
+    return members
+
+
+def extract_archive(archive_path, extract_dir, members=None):
+    """
+    Extracts an archive with a pool of threads, each one inflating members through
+    its own file handle (zlib releases the GIL), largest members first.
+    members can restrict the extraction to a list of ZipInfo
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    start = time.perf_counter()
+    with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+        infos = zip_ref.infolist() if members is None else members
+
+    files = []
+    for info in infos:
+        target_path = Utils.get_extract_path(extract_dir, info.filename)
+        if target_path is None:
+            continue
+        if info.is_dir():
+            os.makedirs(target_path, exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            files.append((info, target_path))
+    files.sort(key=lambda x: x[0].compress_size, reverse=True)
+
+    local = threading.local()
+    handles = []
+
+    def extract_member(info, target_path):
+        if not hasattr(local, 'zip_ref'):
+            local.zip_ref = zipfile.ZipFile(archive_path, 'r')
+            handles.append(local.zip_ref)
+        with local.zip_ref.open(info) as src, open(target_path, 'wb', buffering=Config.EXTRACT_BUFFER_SIZE) as dst:
+            shutil.copyfileobj(src, dst, Config.EXTRACT_BUFFER_SIZE)
+
+    workers = max(1, min(Config.EXTRACT_WORKERS, len(files)))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(extract_member, *f) for f in files]:
+                future.result()
+    finally:
+        for handle in handles:
+            handle.close()
+
+    elapsed = time.perf_counter() - start
+    size = sum(info.file_size for info, _ in files)
+    print('Extracted {} file(s) ({}) in {:.2f}s with {} thread(s)'.format(
+        len(files), Utils.humanify_size(size), elapsed, workers))
 
 
 def run_async(func):
@@ -1164,7 +2748,13 @@ def run_async(func):
 
 
 def import_model(gltf_path, uid, title):
-    bpy.ops.wm.import_modal('INVOKE_DEFAULT', gltf_path=gltf_path, uid=uid, title=title)
+    # Called from a timer when the download is over, make sure the operator gets a window
+    window = bpy.context.window or bpy.context.window_manager.windows[0]
+    if hasattr(bpy.context, "temp_override"):
+        with bpy.context.temp_override(window=window):
+            bpy.ops.wm.import_modal('INVOKE_DEFAULT', gltf_path=gltf_path, uid=uid, title=title)
+    else:
+        bpy.ops.wm.import_modal({'window': window}, 'INVOKE_DEFAULT', gltf_path=gltf_path, uid=uid, title=title)
 
 
 def build_search_request(query, pbr, animated, staffpick, face_count, category, sort_by):
@@ -1265,7 +2855,8 @@ class ThumbnailCollector(threading.Thread):
     def run(self):
         if not self.url:
             return
-        requests.get(self.url, stream=True, hooks={'response': self.handle_thumbnail})
+        with transfer_scheduler.transfer('INTERACTIVE') as self.transfer:
+            requests.get(self.url, stream=True, hooks={'response': self.handle_thumbnail})
 
     def handle_thumbnail(self, r, *args, **kwargs):
         uid = r.url.split('/')[4]
@@ -1276,17 +2867,7 @@ class ThumbnailCollector(threading.Thread):
                 pass
         thumbnail_path = os.path.join(Config.SKETCHFAB_THUMB_DIR, uid) + '.jpeg'
 
-        with open(thumbnail_path, "wb") as f:
-            total_length = r.headers.get('content-length')
-
-            if total_length is None and r.content:
-                f.write(r.content)
-            else:
-                dl = 0
-                total_length = int(total_length)
-                for data in r.iter_content(chunk_size=4096):
-                    dl += len(data)
-                    f.write(data)
+        StreamingDownload(r, thumbnail_path, transfer=self.transfer).run()
 
         thumbnailsProgress.discard(uid)
 
@@ -1374,6 +2955,119 @@ class LoginModal(bpy.types.Operator):
         return {'RUNNING_MODAL'}
 
 
+class ImportProfile:
+    """
+    Wall time of each step of a model import, with the peak memory change and
+    the meshes, images and materials created by the import
+    """
+    DATABLOCKS = ('meshes', 'images', 'materials')
+
+    def __init__(self, uid, title):
+        self.uid = uid
+        self.title = title
+        self.time_started = time.perf_counter()
+        self.steps = OrderedDict((step, 0.0) for step in Config.IMPORT_REPORT_STEPS)
+        self.total = 0.0
+        self.peak_rss = None
+        self.rss_change = None
+        self.existing = None
+        self.created = OrderedDict()
+
+    def add_step(self, step, seconds):
+        self.steps[step] = self.steps.get(step, 0.0) + seconds
+
+    def begin_import(self):
+        self.peak_rss = Utils.get_peak_rss()
+        self.existing = {name: set(d.as_pointer() for d in getattr(bpy.data, name)) for name in ImportProfile.DATABLOCKS}
+
+    def end_import(self):
+        self.total = time.perf_counter() - self.time_started
+        peak_rss = Utils.get_peak_rss()
+        if peak_rss is not None and self.peak_rss is not None:
+            self.rss_change = peak_rss - self.peak_rss
+
+        from . import pack_for_export
+
+        existing = self.existing or {}
+        for name in ImportProfile.DATABLOCKS:
+            created = [d for d in getattr(bpy.data, name) if d.as_pointer() not in existing.get(name, ())]
+            if name == 'meshes':
+                # Same estimate as the size of meshes in exported files
+                size = sum(pack_for_export.get_mesh_size(m) for m in created)
+            elif name == 'images':
+                size = sum(Utils.get_image_memory_size(i) for i in created)
+            else:
+                # Materials are reported with their number of nodes
+                size = sum(len(m.node_tree.nodes) for m in created if m.node_tree is not None)
+            self.created[name] = (len(created), size)
+
+    def get_lines(self):
+        lines = ['Total: {:.2f}s ({})'.format(self.total, ', '.join(
+            '{} {:.2f}s'.format(step, seconds) for step, seconds in self.steps.items() if seconds))]
+        if self.rss_change is not None:
+            lines.append('Peak memory: +{}'.format(Utils.humanify_size(self.rss_change)))
+        for name, (count, size) in self.created.items():
+            if name == 'materials':
+                lines.append('{} material(s), {} node(s)'.format(count, size))
+            else:
+                lines.append('{} {}(s), {}'.format(count, 'mesh' if name == 'meshes' else 'image', Utils.humanify_size(size)))
+        return lines
+
+    def write(self, filepath):
+        """
+        Appends the report to a .csv file, next to the download history
+        """
+        create_file = not os.path.exists(filepath)
+        with open(filepath, 'a+') as f:
+            if create_file:
+                f.write("Date, Model name, Model link, {}, Total (s), Peak memory change (bytes), "
+                        "Meshes, Meshes size (bytes), Images, Images size (bytes), Materials, Material nodes,\n".format(
+                        ", ".join("{} (s)".format(step.capitalize()) for step in self.steps)))
+            values = [time.strftime("%Y-%m-%d %H:%M:%S"), self.title.replace(",", " "),
+                      "https://sketchfab.com/models/{}".format(self.uid)]
+            values += ["{:.3f}".format(seconds) for seconds in self.steps.values()]
+            values += ["{:.3f}".format(self.total), str(self.rss_change) if self.rss_change is not None else ""]
+            for count, size in self.created.values():
+                values += [str(count), str(size)]
+            f.write(", ".join(values) + ",\n")
+
+# Profiles of the imports in progress, and reports of the last ones
+import_profiles = {}
+import_reports = deque(maxlen=Config.IMPORT_REPORTS_SHOWN)
+
+def start_import_profile(uid, title):
+    if get_addon_preferences().useImportReports:
+        import_profiles[uid] = ImportProfile(uid, title)
+
+def add_import_step(uid, step, seconds):
+    # Called from worker threads as well, profiles are only read on the main thread
+    profile = import_profiles.get(uid)
+    if profile is not None:
+        profile.add_step(step, seconds)
+
+def begin_import_profile(uid):
+    profile = import_profiles.get(uid)
+    if profile is not None:
+        profile.begin_import()
+
+def end_import_profile(uid):
+    profile = import_profiles.pop(uid, None)
+    if profile is None:
+        return
+
+    profile.end_import()
+    import_reports.appendleft(profile)
+    print('Import report of {}:\n  {}'.format(profile.title, '\n  '.join(profile.get_lines())))
+
+    # Saved next to the download history
+    download_history = get_addon_preferences().downloadHistory
+    if download_history:
+        try:
+            profile.write(os.path.splitext(os.path.abspath(download_history))[0] + "_imports.csv")
+        except OSError:
+            print("Error encountered while saving the import report")
+
+
 class ImportModalOperator(bpy.types.Operator):
     """Imports the selected model into Blender"""
     bl_idname = "wm.import_modal"
@@ -1392,16 +3086,31 @@ class ImportModalOperator(bpy.types.Operator):
         if bpy.context.scene.render.engine not in ["CYCLES", "BLENDER_EEVEE"]:
             bpy.context.scene.render.engine = "BLENDER_EEVEE"
         try:
-            old_objects = [o.name for o in bpy.data.objects] # Get the current objects inorder to find the new node hierarchy
+            # Get the current objects in order to find the new node hierarchy
+            # Pointers are used rather than names, which can collide or change on import
+            old_objects = set(o.as_pointer() for o in bpy.data.objects)
+            begin_import_profile(self.uid)
+            time_start = time.perf_counter()
             bpy.ops.import_scene.gltf(filepath=self.gltf_path)
+            add_import_step(self.uid, 'import', time.perf_counter() - time_start)
+            time_start = time.perf_counter()
             set_import_status('')
             Utils.clean_downloaded_model_dir(self.uid)
-            Utils.clean_node_hierarchy([o for o in bpy.data.objects if o.name not in old_objects], self.title)
+            Utils.clean_node_hierarchy([o for o in bpy.data.objects if o.as_pointer() not in old_objects], self.title)
+            new_objects = [o for o in bpy.data.objects if o.as_pointer() not in old_objects]
+            if get_sketchfab_props().deduplicate_meshes:
+                Utils.deduplicate_meshes(new_objects)
+
+            # Keep the imported model for next imports
+            model = get_sketchfab_model(self.uid)
+            ModelLibrary.write_blend(self.uid, self.title, new_objects, model.updated_at if model else None)
+            finish_import(self.uid, self.title, new_objects, time_start)
             return {'FINISHED'}
         except Exception:
             import traceback
             print(traceback.format_exc())
             set_import_status('')
+            batch_import.set_state(self.uid, 'FAILED')
             return {'FINISHED'}
 
     def invoke(self, context, event):
@@ -1410,19 +3119,339 @@ class ImportModalOperator(bpy.types.Operator):
         return {'RUNNING_MODAL'}
 
 
-class GetRequestThread(threading.Thread):
-    def __init__(self, url, callback, headers={}):
-        self.url = url
-        self.callback = callback
-        self.headers = headers
-        threading.Thread.__init__(self)
+class ImportWorkerPool:
+    """
+    Imports glTF files in background Blender processes (import_in_background.py),
+    which also clean the hierarchy and save the model in a .blend file. The main
+    session only appends the resulting collection, so that Blender stays
+    responsive and several models can be converted in parallel
+    """
+    def __init__(self):
+        self.pending = []
+        self.running = []
+
+    def submit(self, gltf_path, uid, title):
+        self.pending.append({
+            'gltf_path': gltf_path,
+            'uid': uid,
+            'title': title,
+        })
+        if not bpy.app.timers.is_registered(update_import_workers):
+            bpy.app.timers.register(update_import_workers)
+
+    def start(self, job):
+        job['time_started'] = time.perf_counter()
+        job['tempdir'] = tempfile.mkdtemp()
+        with open(os.path.join(job['tempdir'], "import-sketchfab.json"), 'w') as s:
+            json.dump({
+                    "gltf_path": job['gltf_path'],
+                    "title": job['title'],
+                    "deduplicate_meshes": get_sketchfab_props().deduplicate_meshes,
+                    "addon": __name__,
+                    "addon_path": os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+                    }, s)
 
-    def run(self):
-        requests.get(self.url, headers=self.headers, hooks={'response': self.callback})
+        script_path = os.path.dirname(os.path.realpath(__file__))
+        job['process'] = subprocess.Popen([
+                bpy.app.binary_path,
+                "--background",
+                "-noaudio",
+                "--factory-startup",
+                "--python", os.path.join(script_path, "import_in_background.py"),
+                "--", job['tempdir']
+                ])
+        self.running.append(job)
+
+    def finish(self, job):
+        try:
+            if job['process'].returncode != 0:
+                batch_import.set_state(job['uid'], 'FAILED')
+                ShowMessage("ERROR", "Import error", "Failed to import {}".format(job['title']))
+                return
 
+            with open(os.path.join(job['tempdir'], "import-sketchfab.json"), 'r') as s:
+                r = json.load(s)
 
-class View3DPanel:
-    bl_space_type = 'VIEW_3D'
+            begin_import_profile(job['uid'])
+            objects = import_library_blend(r['filepath'], r['collection'])
+            add_import_step(job['uid'], 'import', time.perf_counter() - job['time_started'])
+
+            # The worker output is already what the library stores
+            if get_addon_preferences().useLibrary and get_addon_preferences().libraryImportMode != 'NONE':
+                model = get_sketchfab_model(job['uid'])
+                ModelLibrary.add_blend(job['uid'], r['filepath'], r['collection'], model.updated_at if model else None)
+            finish_import(job['uid'], job['title'], objects)
+        except Exception:
+            import traceback
+            print(traceback.format_exc())
+            batch_import.set_state(job['uid'], 'FAILED')
+        finally:
+            shutil.rmtree(job['tempdir'], ignore_errors=True)
+            Utils.clean_downloaded_model_dir(job['uid'])
+
+    def update(self):
+        for job in list(self.running):
+            if job['process'].poll() is not None:
+                self.running.remove(job)
+                self.finish(job)
+
+        while self.pending and len(self.running) < get_addon_preferences().importWorkers:
+            self.start(self.pending.pop(0))
+
+        if self.pending or self.running:
+            set_import_status('Importing in background ({} left)'.format(len(self.pending) + len(self.running)))
+            return Config.IMPORT_WORKER_POLL_INTERVAL
+
+        batch_import.update_status()
+        return None
+
+import_worker_pool = ImportWorkerPool()
+
+def import_library_blend(filepath, collection_name, link=False):
+    """
+    Appends the collection of a .blend file to the active collection, or links it
+    and adds an instance of it, so that several imports share the same data.
+    Returns the appended objects, or the instance of the linked collection
+    """
+    if bpy.context.scene.render.engine not in ["CYCLES", "BLENDER_EEVEE"]:
+        bpy.context.scene.render.engine = "BLENDER_EEVEE"
+
+    with bpy.data.libraries.load(filepath, link=link) as (data_from, data_to):
+        data_to.collections = [collection_name]
+    collection = data_to.collections[0]
+    active_collection = bpy.context.view_layer.active_layer_collection.collection
+
+    if link:
+        instance = bpy.data.objects.new(collection.name, None)
+        instance.instance_type = 'COLLECTION'
+        instance.instance_collection = collection
+        active_collection.objects.link(instance)
+        instance.select_set(True)
+        return [instance]
+
+    active_collection.children.link(collection)
+    for ob in collection.all_objects:
+        if ob.parent is None:
+            ob.select_set(True)
+    return list(collection.all_objects)
+
+def apply_lod_options(objects, title):
+    """
+    Fits the imported model in the face budget, and generates its levels of detail
+    """
+    skfb = get_sketchfab_props()
+    # Linked models cannot be edited
+    if not any(ob.type == 'MESH' for ob in objects):
+        return
+    try:
+        face_count = Utils.apply_face_budget(objects, skfb.face_budget)
+        if skfb.face_budget and face_count > skfb.face_budget:
+            ShowMessage("ERROR", "Face budget", "{} keeps {} faces, over the budget of {}".format(
+                title, Utils.humanify_number(face_count), Utils.humanify_number(skfb.face_budget)))
+        if skfb.generate_lods:
+            Utils.generate_lods(objects, title)
+    except Exception:
+        import traceback
+        print(traceback.format_exc())
+
+def finish_import(uid, title, objects, cleanup_start=None):
+    """
+    Called once the objects of a model are in the scene, whatever the import path
+    """
+    # The batch already counts it as failed
+    if batch_import.is_failed(uid):
+        print('Import of {} finished after it was given up, removing it'.format(title))
+        Utils.remove_datablocks(objects, bpy.data.objects)
+        return
+
+    cleanup_start = time.perf_counter() if cleanup_start is None else cleanup_start
+    batch_import.place(uid, objects)
+    apply_lod_options(objects, title)
+    add_import_step(uid, 'cleanup', time.perf_counter() - cleanup_start)
+    end_import_profile(uid)
+    batch_import.set_state(uid, 'DONE')
+
+
+class BatchImport:
+    """
+    Imports several models in a single operation. Downloads run concurrently
+    (as many as the IMPORT transfer class allows), while the imports are
+    serialised on the main thread. Each model gets its own collection, and
+    the models are laid out in a grid according to their bounding boxes.
+    A job is PENDING, DOWNLOADING, PREPARING (unzip and textures), IMPORTING,
+    then DONE or FAILED. Only downloads are given up after a timeout, the
+    later stages of a failed job are skipped or removed
+    """
+    def __init__(self):
+        self.selection = OrderedDict()
+        self.jobs = OrderedDict()
+        self.collection = None
+
+    def is_running(self):
+        return any(job['state'] in {'PENDING', 'DOWNLOADING', 'PREPARING', 'IMPORTING'} for job in self.jobs.values())
+
+    def get_model(self, uid):
+        job = self.jobs.get(uid)
+        return job['model'] if job is not None else self.selection.get(uid)
+
+    def is_failed(self, uid):
+        # Also read by the download threads, between stages
+        job = self.jobs.get(uid)
+        return job is not None and job['state'] == 'FAILED'
+
+    def discard(self, uid):
+        if uid in self.jobs and self.jobs[uid]['state'] in {'DONE', 'FAILED'}:
+            del self.jobs[uid]
+
+    def toggle(self, model):
+        if model.uid in self.selection:
+            del self.selection[model.uid]
+        else:
+            self.selection[model.uid] = model
+
+    def start(self):
+        self.jobs = OrderedDict(
+            (uid, {'model': model, 'title': model.title, 'state': 'PENDING', 'downloaded': 0, 'total': 0, 'time_updated': 0.0})
+            for uid, model in self.selection.items()
+        )
+        self.selection.clear()
+
+        self.collection = bpy.data.collections.new(Config.BATCH_COLLECTION_NAME)
+        bpy.context.view_layer.active_layer_collection.collection.children.link(self.collection)
+        self.columns = ceil(sqrt(len(self.jobs)))
+        self.column = 0
+        self.cursor_x = 0.0
+        self.row_y = 0.0
+        self.row_depth = 0.0
+
+        if not bpy.app.timers.is_registered(update_batch_import):
+            bpy.app.timers.register(update_batch_import)
+
+    def update(self):
+        # A download thread can be stuck on a stalled connection
+        now = time.perf_counter()
+        for uid, job in self.jobs.items():
+            if job['state'] == 'DOWNLOADING' and now - job['time_updated'] > Config.BATCH_DOWNLOAD_TIMEOUT:
+                print('No progress on the download of {} for {}s, giving up'.format(job['title'], Config.BATCH_DOWNLOAD_TIMEOUT))
+                self.set_state(uid, 'FAILED')
+
+        downloading = [job for job in self.jobs.values() if job['state'] == 'DOWNLOADING']
+        pending = [uid for uid, job in self.jobs.items() if job['state'] == 'PENDING']
+        # One request per tick, the /download call is made on the main thread
+        if pending and len(downloading) < Config.TRANSFER_CLASSES['IMPORT']['concurrency']:
+            self.set_state(pending[0], 'DOWNLOADING')
+            try:
+                get_sketchfab_props().skfb_api.download_model(pending[0])
+            except Exception:
+                import traceback
+                print(traceback.format_exc())
+                self.set_state(pending[0], 'FAILED')
+
+        self.update_status()
+        return Config.IMPORT_WORKER_POLL_INTERVAL if self.is_running() else None
+
+    def set_state(self, uid, state):
+        job = self.jobs.get(uid)
+        if job is not None and job['state'] not in {'DONE', 'FAILED'}:
+            job['state'] = state
+            job['time_updated'] = time.perf_counter()
+            self.update_status()
+
+    def set_progress(self, uid, downloaded, total_length):
+        job = self.jobs.get(uid)
+        if job is not None:
+            job['downloaded'] = downloaded
+            job['total'] = total_length
+            job['time_updated'] = time.perf_counter()
+
+    def update_status(self):
+        if not self.is_running():
+            set_import_status('')
+            return
+
+        states = [job['state'] for job in self.jobs.values()]
+        downloaded = sum(job['downloaded'] for job in self.jobs.values())
+        total = sum(job['total'] for job in self.jobs.values())
+        status = 'Batch: {}/{} imported'.format(states.count('DONE'), len(states))
+        if states.count('FAILED'):
+            status += ', {} failed'.format(states.count('FAILED'))
+        if total:
+            status += ' ({}/{} downloaded)'.format(Utils.humanify_size(downloaded), Utils.humanify_size(total))
+        set_import_status(status)
+
+    def place(self, uid, objects):
+        """
+        Moves the objects of a model in their own collection, and in the next
+        cell of the grid
+        """
+        job = self.jobs.get(uid)
+        if job is None or not objects or self.collection is None:
+            return
+
+        # Appended library models already come in their own collection
+        pointers = set(ob.as_pointer() for ob in objects)
+        collections = set(c for ob in objects for c in ob.users_collection)
+        collection = collections.pop() if len(collections) == 1 else None
+        if (collection is not None and collection != bpy.context.scene.collection
+                and set(ob.as_pointer() for ob in collection.all_objects) == pointers):
+            for parent in [bpy.context.scene.collection] + list(bpy.data.collections):
+                if collection.name in parent.children:
+                    parent.children.unlink(collection)
+        else:
+            collection = bpy.data.collections.new(job['title'])
+            for ob in objects:
+                for users_collection in ob.users_collection:
+                    users_collection.objects.unlink(ob)
+                collection.objects.link(ob)
+        self.collection.children.link(collection)
+
+        bpy.context.view_layer.update()
+        bounding_box = Utils.get_bounding_box(objects)
+        if bounding_box is None:
+            bounding_box = (Vector((0, 0, 0)), Vector((0, 0, 0)))
+        size = bounding_box[1] - bounding_box[0]
+        margin = Config.BATCH_GRID_MARGIN * max(size.x, size.y)
+
+        if self.column == self.columns:
+            self.column = 0
+            self.cursor_x = 0.0
+            self.row_y -= self.row_depth
+            self.row_depth = 0.0
+
+        # Rows are filled along +X, and stacked along -Y
+        offset = Vector((self.cursor_x - bounding_box[0].x, self.row_y - bounding_box[1].y, 0))
+        for ob in objects:
+            if ob.parent is None or ob.parent.as_pointer() not in pointers:
+                ob.matrix_world.translation += offset
+
+        self.cursor_x += size.x + margin
+        self.row_depth = max(self.row_depth, size.y + margin)
+        self.column += 1
+
+batch_import = BatchImport()
+
+def update_batch_import():
+    return batch_import.update()
+
+def update_import_workers():
+    return import_worker_pool.update()
+
+
+class GetRequestThread(threading.Thread):
+    def __init__(self, url, callback, headers={}):
+        self.url = url
+        self.callback = callback
+        self.headers = headers
+        threading.Thread.__init__(self)
+
+    def run(self):
+        with transfer_scheduler.transfer('INTERACTIVE') as transfer:
+            r = requests.get(self.url, headers=self.headers, hooks={'response': self.callback})
+            transfer.consume(len(r.content))
+
+
+class View3DPanel:
+    bl_space_type = 'VIEW_3D'
     bl_region_type = 'TOOLS' if bpy.app.version < (2, 80, 0) else 'UI'
     bl_category = 'Sketchfab'
     bl_context = 'objectmode'
@@ -1639,12 +3668,15 @@ class SketchfabBrowse(View3DPanel, bpy.types.Panel):
                         model.info_requested = True
 
                 draw_model_info(col, model, context)
+                draw_import_options(col, context, model)
                 draw_import_button(col, model, context)
+                draw_batch_import(col, model, context)
         else:
             uid = ""
             if "sketchfab.com" in props.manualImportPath:
                 uid = props.manualImportPath[-32:]
             m = Model(uid)
+            draw_import_options(col, context)
             draw_import_button(col, m, context)
 
     def draw(self, context):
@@ -1656,6 +3688,27 @@ class SketchfabBrowse(View3DPanel, bpy.types.Panel):
         wm = context.window_manager
         return wm.invoke_props_dialog(self, width=900, height=850)
 
+class SketchfabImportReportPanel(View3DPanel, bpy.types.Panel):
+    bl_idname = "VIEW3D_PT_sketchfab_import_report"
+    bl_label = "Import report"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        return get_addon_preferences().useImportReports
+
+    def draw(self, context):
+        if not import_reports:
+            self.layout.label(text="No model imported yet")
+            return
+
+        for profile in import_reports:
+            col = self.layout.box().column(align=True)
+            col.label(text=profile.title, icon='IMPORT')
+            for line in profile.get_lines():
+                col.label(text=line)
+
+
 class SketchfabExportPanel(View3DPanel, bpy.types.Panel):
     #bl_idname = "wm.sketchfab_export" if bpy.app.version == (2, 79, 0) else "VIEW3D_PT_sketchfab_export"
     bl_options = {'DEFAULT_CLOSED'}
@@ -1674,13 +3727,19 @@ class SketchfabExportPanel(View3DPanel, bpy.types.Panel):
 
         # Selection only
         layout.prop(props, "selection")
+        layout.prop(props, "fit_to_limit")
+        row = layout.row()
+        row.prop(props, "compression")
+        if props.compression in {'GZIP', 'ZSTD'}:
+            row.prop(props, "compression_level")
 
         # Model properties
         col = layout.box().column(align=True)
+        # Updated separately when reuploading
+        col.prop(props, "title")
+        col.prop(props, "description")
+        col.prop(props, "tags")
         if not props.reuploadBoolean:
-            col.prop(props, "title")
-            col.prop(props, "description")
-            col.prop(props, "tags")
             col.prop(props, "draft")
             col.prop(props, "private")
             if props.private:
@@ -1705,10 +3764,50 @@ class SketchfabExportPanel(View3DPanel, bpy.types.Panel):
                 upload_label = "Log in to upload models"
             elif bpy.context.mode != 'OBJECT':
                 upload_label = "Export is only available in object mode"
-        if sf_state.uploading:
+        if sf_state.preparing:
+            upload_label = sf_state.progress_label
+            upload_icon  = "SORTTIME"
+        elif sf_state.uploading:
             upload_label = "Uploading %s" % sf_state.size_label
+            if sf_state.upload_size:
+                upload_label = "Uploading %s / %s (%s/s)" % (
+                    Utils.humanify_size(sf_state.bytes_sent),
+                    Utils.humanify_size(sf_state.upload_size),
+                    Utils.humanify_size(sf_state.upload_throughput))
             upload_icon  = "SORTTIME"
         row.operator("wm.sketchfab_export", icon=upload_icon, text=upload_label)
+        if sf_state.preparing:
+            row.operator("wm.sketchfab_export_cancel", text="", icon='CANCEL')
+
+        # Estimated size, and its largest contributors
+        col = layout.box().column(align=True)
+        row = col.row()
+        size_estimate = sf_state.size_estimate
+        if size_estimate is None:
+            row.label(text="Upload size unknown")
+        else:
+            upload_limit = get_upload_limit()
+            # The estimate is measured before compression, it can only be checked against the limit without it
+            if props.compression == 'NONE':
+                row.label(text="Estimated size: %s / %s" % (Utils.humanify_size(size_estimate['total']), Utils.humanify_size(upload_limit)),
+                          icon='ERROR' if size_estimate['total'] > upload_limit else 'CHECKMARK')
+            else:
+                row.label(text="Uncompressed size: %s (limit %s)" % (Utils.humanify_size(size_estimate['total']), Utils.humanify_size(upload_limit)))
+        row.operator("wm.sketchfab_estimate_size", text="", icon='FILE_REFRESH')
+        if size_estimate is not None:
+            for size, datablock_type, name in size_estimate['breakdown']:
+                share = 100 * size / size_estimate['total'] if size_estimate['total'] else 0
+                col.label(text="%s (%s, %d%%)" % (name, Utils.humanify_size(size), share),
+                          icon={'MESH': 'MESH_DATA', 'IMAGE': 'IMAGE_DATA'}.get(datablock_type, 'ACTION'))
+
+        # Upload interrupted by an error or a restart
+        pending_upload = sf_state.pending_upload
+        if pending_upload and not sf_state.uploading:
+            col = layout.box().column(align=True)
+            col.label(text="Interrupted upload: %s" % pending_upload["filename"], icon='ERROR')
+            row = col.row(align=True)
+            row.operator("wm.sketchfab_export", text="Resume upload", icon='FILE_REFRESH').resume = True
+            row.operator("wm.sketchfab_discard_upload", text="Discard", icon='TRASH')
 
         model_url = sf_state.model_url
         if model_url:
@@ -1743,6 +3842,7 @@ class SketchfabModel:
         self.uid = json_data['uid']
         self.vertex_count = json_data['vertexCount']
         self.face_count = json_data['faceCount']
+        self.updated_at = json_data.get('updatedAt')
 
         if 'archives' in json_data and  'gltf' in json_data['archives']:
             if 'size' in json_data['archives']['gltf'] and json_data['archives']['gltf']['size']:
@@ -1762,6 +3862,23 @@ class SketchfabModel:
         self.time_url_requested = None
         self.url_expires = None
 
+    def set_download(self, download):
+        """Fills the download url data from a DownloadUrlCache entry"""
+        if download is None:
+            self.download_url = None
+            self.time_url_requested = None
+            self.url_expires = None
+        else:
+            self.download_url = download['url']
+            self.time_url_requested = download['time_requested']
+            self.url_expires = download['expires']
+
+    def is_download_url_valid(self):
+        if not self.download_url:
+            return False
+        expires_at = self.time_url_requested + self.url_expires
+        return time.time() < expires_at - Config.DOWNLOAD_URL_EXPIRY_MARGIN
+
 def ShowMessage(icon = "INFO", title = "Info", message = "Information"):
     def draw(self, context):
         self.layout.label(text=message)
@@ -1779,10 +3896,55 @@ class SketchfabDownloadModel(bpy.types.Operator):
 
     def execute(self, context):
         skfb_api = context.window_manager.sketchfab_browser.skfb_api
+        # Imported on its own, even if it failed in the last batch
+        batch_import.discard(self.model_uid)
         skfb_api.download_model(self.model_uid)
         return {'FINISHED'}
 
 
+class SketchfabBatchSelect(bpy.types.Operator):
+    """Add or remove models from the batch to import"""
+    bl_idname = "wm.sketchfab_batch_select"
+    bl_label = "Select models"
+    bl_options = {'INTERNAL'}
+
+    model_uid : bpy.props.StringProperty(name="uid")
+    action : EnumProperty(
+        items=(
+            ('TOGGLE', "Toggle", "Add or remove the model"),
+            ('ALL', "All", "Add all the results of the page"),
+            ('CLEAR', "Clear", "Remove all the models"),
+        ),
+        default='TOGGLE'
+    )
+
+    def execute(self, context):
+        skfb = get_sketchfab_props()
+        if self.action == 'CLEAR':
+            batch_import.selection.clear()
+        elif self.action == 'ALL':
+            for uid, model in skfb.search_results.get('current', {}).items():
+                batch_import.selection[uid] = model
+        else:
+            model = get_sketchfab_model(self.model_uid)
+            if model is not None:
+                batch_import.toggle(model)
+        return {'FINISHED'}
+
+
+class SketchfabBatchImport(bpy.types.Operator):
+    """Import all the models of the batch, each one in its own collection"""
+    bl_idname = "wm.sketchfab_batch_import"
+    bl_label = "Import models"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        if not batch_import.selection or batch_import.is_running():
+            return {'CANCELLED'}
+        batch_import.start()
+        return {'FINISHED'}
+
+
 class ViewOnSketchfab(bpy.types.Operator):
     """Upload your model to Sketchfab"""
     bl_idname = "wm.sketchfab_view"
@@ -1996,6 +4158,29 @@ class SketchfabExportProps(bpy.types.PropertyGroup):
             description="Paste full model url to reupload to",
             default="",
             maxlen=1024)
+    fit_to_limit : BoolProperty(
+        name="Fit to plan limit",
+        description="Downscale the largest packed textures until the file fits in the upload limit of your plan",
+        default=False,
+    )
+    compression : EnumProperty(
+        name="Compression",
+        items=(
+            ('BLENDER', "Blender default", "Compress the file when saving it, with the compression of this Blender version"),
+            ('NONE', "None", "Do not compress the file: fastest to prepare, largest to upload"),
+            ('GZIP', "Deflate (multithreaded)", "Compress the saved file with gzip, using all processors"),
+            ('ZSTD', "Zstandard (multithreaded)", "Compress the saved file with zstd, using all processors (Blender 3.0+)"),
+        ),
+        description="Compression of the uploaded file, trading preparation time for upload size",
+        default='BLENDER'
+    )
+    compression_level : IntProperty(
+        name="Level",
+        description="Compression level, from 1 (fastest) to 9 for deflate and 22 for zstandard",
+        default=6,
+        min=1,
+        max=22
+    )
     active_project : EnumProperty(
         name="Project",
         items=get_org_projects,
@@ -2012,10 +4197,30 @@ class _SketchfabState:
         "model_url",
         "report_message",
         "report_type",
+        "preparing",
+        "progress_label",
+        "cancel_requested",
+        "bytes_sent",
+        "upload_size",
+        "upload_throughput",
+        "pending_upload",
+        "session",
+        "scene_changes",
+        "size_estimate",
         )
 
     def __init__(self):
         self.uploading = False
+        self.preparing = False
+        self.progress_label = ""
+        self.cancel_requested = False
+        self.bytes_sent = 0
+        self.upload_size = 0
+        self.upload_throughput = 0.0
+        self.pending_upload = None
+        self.session = uuid4().hex
+        self.scene_changes = 0
+        self.size_estimate = None
         self.size_label = ""
         self.model_url = ""
         self.report_message = ""
@@ -2024,18 +4229,358 @@ class _SketchfabState:
 sf_state = _SketchfabState()
 del _SketchfabState
 
+class PendingUpload:
+    """
+    Upload that did not complete, persisted in the plugin cache along with its
+    prepared file, so that it can be sent again without preparing the file,
+    even after a restart. The Data API takes the model in a single request,
+    so an upload is resumed by sending the whole prepared file again
+    """
+    CACHE_KEY = 'pending_upload'
+
+    def load():
+        record = Cache.get_key(PendingUpload.CACHE_KEY)
+        if record is not None and not os.path.exists(record['filepath']):
+            Cache.delete_key(PendingUpload.CACHE_KEY)
+            record = None
+        sf_state.pending_upload = record
+
+    def save(record):
+        Cache.save_key(PendingUpload.CACHE_KEY, record)
+        sf_state.pending_upload = record
+
+    def clear():
+        Cache.delete_key(PendingUpload.CACHE_KEY)
+        sf_state.pending_upload = None
+
+@persistent
+def count_scene_changes(scene, depsgraph=None):
+    sf_state.scene_changes += 1
+
+@persistent
+def start_export_session(dummy=None):
+    # Another file was loaded, the last uploads cannot be compared with it
+    sf_state.session = uuid4().hex
+    sf_state.scene_changes = 0
+
 # remove file copy
 def terminate(filepath):
+    # The file of an upload to resume is kept
+    if sf_state.pending_upload and sf_state.pending_upload['filepath'] == filepath:
+        return
     print(filepath)
     os.remove(filepath)
     os.rmdir(os.path.dirname(filepath))
 
+def estimate_export_size(selection):
+    """
+    Estimates the size of the uploaded file, before compression, from the
+    datablocks that would be kept by pack_for_export.prepare_assets.
+    Returns the total and the contributions, largest first
+    """
+    from . import pack_for_export
+
+    meshes = set()
+    images = set()
+    for ob in bpy.context.scene.objects:
+        if ob.type != 'MESH' or ob.data is None:
+            continue
+        # Hidden and unselected meshes are removed when exporting the selection
+        if selection and not (ob.visible_get() and ob.select_get()):
+            continue
+        meshes.add(ob.data)
+        if not selection:
+            continue
+        for mat_slot in ob.material_slots:
+            if mat_slot.material and mat_slot.material.use_nodes:
+                for n in mat_slot.material.node_tree.nodes:
+                    if n.type == "TEX_IMAGE" and n.image is not None:
+                        images.add(n.image)
+
+    # Without selection, only the images already packed are in the file
+    if not selection:
+        images = set(img for img in bpy.data.images if img.users and img.packed_file)
+
+    breakdown = [(pack_for_export.get_mesh_size(mesh), 'MESH', mesh.name) for mesh in meshes]
+    breakdown += [(pack_for_export.get_image_size(img), 'IMAGE', img.name) for img in images]
+    breakdown += [(Config.KEYFRAME_SIZE * sum(len(fc.keyframe_points) for fc in action.fcurves), 'ACTION', action.name)
+                  for action in bpy.data.actions if action.users]
+    breakdown.sort(reverse=True)
+    return sum(size for size, datablock_type, name in breakdown), breakdown
+
+def get_upload_limit():
+    api = get_sketchfab_props().skfb_api
+    if api.use_org_profile:
+        return Config.SKETCHFAB_UPLOAD_LIMITS["ent"]
+    # Logged out users and unknown plans get the basic limit
+    return Config.SKETCHFAB_UPLOAD_LIMITS.get(api.plan_type, Config.SKETCHFAB_UPLOAD_LIMITS["basic"])
+
 def upload_report(report_message, report_type):
     sf_state.report_message = report_message
     sf_state.report_type = report_type
 
+def compress_blend_file(filepath, method, level):
+    """
+    Compresses an uncompressed .blend file in place. Chunks are compressed in
+    parallel as independent zstd frames, or as deflate blocks ending on a byte
+    boundary: Blender only reads the first member of a gzip file, so they are
+    joined in a single gzip stream. Returns the compressed size
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if method == 'ZSTD':
+        try:
+            import zstandard
+        except ImportError:
+            print("zstandard is not available, using deflate")
+            method = 'GZIP'
+
+    if method == 'ZSTD':
+        def compress(chunk):
+            return zstandard.ZstdCompressor(level=level).compress(chunk)
+    else:
+        def compress(chunk):
+            # Raw deflate, the sync flush ends the data on a byte boundary without closing the stream
+            compressor = zlib.compressobj(min(level, 9), zlib.DEFLATED, -15)
+            return compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    time_start = time.perf_counter()
+    size = os.path.getsize(filepath)
+    temp_path = filepath + ".compressed"
+    frames = []
+    crc = 0
+    workers = Config.EXPORT_COMPRESSION_WORKERS
+    with open(filepath, 'rb') as src, open(temp_path, 'wb') as dst, ThreadPoolExecutor(workers) as executor:
+        if method == 'GZIP':
+            dst.write(struct.pack('<4BI2B', 0x1F, 0x8B, zlib.DEFLATED, 0, 0, 0, 255))
+        while True:
+            # Only a few chunks per worker are in memory at once
+            chunks = [chunk for chunk in (src.read(Config.EXPORT_COMPRESSION_CHUNK_SIZE) for _ in range(2 * workers)) if chunk]
+            if not chunks:
+                break
+            for chunk, data in zip(chunks, executor.map(compress, chunks)):
+                dst.write(data)
+                frames.append((len(data), len(chunk)))
+                crc = zlib.crc32(chunk, crc)
+
+        if method == 'GZIP':
+            # Empty final block, then the checksum and size of the whole file
+            dst.write(zlib.compressobj(0, zlib.DEFLATED, -15).flush())
+            dst.write(struct.pack('<2I', crc, size & 0xFFFFFFFF))
+        else:
+            seek_table = b"".join(struct.pack('<2I', *frame) for frame in frames)
+            seek_table += struct.pack('<IBI', len(frames), 0, Config.ZSTD_SEEKABLE_MAGIC)
+            dst.write(struct.pack('<2I', Config.ZSTD_SKIPPABLE_MAGIC, len(seek_table)) + seek_table)
+
+    os.replace(temp_path, filepath)
+    compressed_size = os.path.getsize(filepath)
+    print("Compressed {} to {} ({:.1f}%) with {} level {} in {:.2f}s".format(
+        Utils.humanify_size(size), Utils.humanify_size(compressed_size),
+        100 * compressed_size / size if size else 100, method, level, time.perf_counter() - time_start))
+    return compressed_size
+
+
+class StreamingUpload:
+    """
+    Multipart/form-data body of an upload, read by requests as a file: the file
+    part is read in chunks as the request is sent, so memory stays flat whatever
+    the file size. Progress callbacks are throttled to Config.PROGRESS_UPDATE_INTERVAL
+    """
+    def __init__(self, fields, file_field, filepath, on_progress=None):
+        self.boundary = uuid4().hex
+        self.filepath = filepath
+        self.on_progress = on_progress
+
+        header = b"".join(
+            self.get_part_header(name) + str(value).encode('utf-8') + b"\r\n"
+            for name, value in fields.items()
+        )
+        header += self.get_part_header(file_field, os.path.basename(filepath))
+        footer = "\r\n--{}--\r\n".format(self.boundary).encode('utf-8')
+        self.segments = [header, None, footer]
+        self.length = len(header) + os.path.getsize(filepath) + len(footer)
+
+        self.file = None
+        self.segment = 0
+        self.offset = 0
+        self.size = 0
+        self.time_started = None
+        self.last_progress = 0.0
+
+    def get_part_header(self, name, filename=None):
+        disposition = 'form-data; name="{}"'.format(name)
+        if filename is not None:
+            disposition += '; filename="{}"'.format(filename)
+        return "--{}\r\nContent-Disposition: {}\r\n\r\n".format(self.boundary, disposition).encode('utf-8')
+
+    @property
+    def content_type(self):
+        return "multipart/form-data; boundary={}".format(self.boundary)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.time_started if self.time_started else 0.0
+
+    @property
+    def throughput(self):
+        return self.size / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __len__(self):
+        return self.length
+
+    def read(self, size=-1):
+        if self.time_started is None:
+            self.time_started = time.perf_counter()
+        if size is None or size < 0:
+            size = self.length - self.size
+
+        chunks = []
+        remaining = size
+        while remaining > 0 and self.segment < len(self.segments):
+            segment = self.segments[self.segment]
+            if segment is None:
+                if self.file is None:
+                    self.file = open(self.filepath, 'rb')
+                data = self.file.read(remaining)
+                if not data:
+                    self.file.close()
+                    self.segment += 1
+                    continue
+            else:
+                data = segment[self.offset:self.offset + remaining]
+                self.offset += len(data)
+                if self.offset >= len(segment):
+                    self.segment += 1
+                    self.offset = 0
+            chunks.append(data)
+            remaining -= len(data)
+
+        data = b"".join(chunks)
+        self.size += len(data)
+
+        now = time.perf_counter()
+        if self.on_progress and (now - self.last_progress >= Config.PROGRESS_UPDATE_INTERVAL or self.size == self.length):
+            self.last_progress = now
+            self.on_progress(self.size, self.length, self.throughput)
+        return data
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+def update_upload_progress(sent, total, throughput):
+    # Only read by the export panel, redrawn by the modal timer
+    sf_state.bytes_sent = sent
+    sf_state.upload_size = total
+    sf_state.upload_throughput = throughput
+
+def get_reupload_url(reupload_path, api):
+    """
+    Returns the url and uid of the model to reupload to, and an error message
+    if the url cannot be used
+    """
+    if "sketchfab.com/" not in reupload_path:
+        return "", "", "reupload url is malformed %s" % reupload_path
+
+    # Get the model uid
+    try:
+        modelUid = reupload_path[-32:]
+        if not Utils.is_valid_uuid(modelUid):
+            return "", "", "reupload url does not end with a valid uid (32 characters string): %s" % reupload_path
+    except:
+        return "", "", "reupload url is malformed %s" % reupload_path
+
+    # If the model is in an org, find if the user has access to it
+    if "/orgs/" in reupload_path:
+        orgName = reupload_path.split("/orgs/")[1].split("/")[0]
+        orgUid = ""
+        for org in api.user_orgs:
+            if org["username"] == orgName:
+                orgUid = org["uid"]
+                break
+        if not orgUid:
+            return "", modelUid, "User does not appear to belong to org %s" % (orgName)
+        return '{}/{}/models/{}'.format(Config.SKETCHFAB_ORGS, orgUid, modelUid), modelUid, None
+
+    # Otherwise, request a direct reupload
+    return '{}/{}'.format(Config.SKETCHFAB_MODEL, modelUid), modelUid, None
+
+def get_upload_metadata(props):
+    # Only the fields set by the user, the others are kept as they are on Sketchfab
+    metadata = {
+        "name": props.title,
+        "description": props.description,
+        "tags": [tag for tag in props.tags.split(" ") if tag][:42],
+    }
+    return {key: value for key, value in metadata.items() if value}
+
+def get_metadata_changes(state, last_upload):
+    # Without history, every field set in the panel is a change
+    last_metadata = last_upload["metadata"] if last_upload is not None else {}
+    return {key: value for key, value in state["metadata"].items() if value != last_metadata.get(key)}
+
+def patch_metadata(url, changes):
+    """Sends metadata changes to a model, returns an error message or None"""
+    api = get_sketchfab_props().skfb_api
+    try:
+        r = requests.patch(url, json=changes, headers=api.headers)
+    except requests.exceptions.RequestException as e:
+        return "Error: %s" % str(e)
+    if r.status_code not in [requests.codes.ok, requests.codes.no_content]:
+        return "Error code: %s\nMessage:\n%s" % (str(r.status_code), str(r))
+    return None
+
+def get_upload_state(props):
+    """
+    State of the scene when an export starts: a new Blender session, another
+    file, a depsgraph update or different export settings mean the scene changed
+    """
+    return {
+        "session": sf_state.session,
+        "changes": sf_state.scene_changes,
+        "settings": [bpy.data.filepath, props.selection, props.fit_to_limit, props.compression, props.compression_level],
+        "metadata": get_upload_metadata(props),
+    }
+
+class UploadHistory:
+    """
+    State and content fingerprint of the last upload to each model, stored in
+    the plugin cache, so that uploads of unchanged scenes can be skipped
+    """
+    CACHE_KEY = 'upload_history'
+
+    def get(uid):
+        return (Cache.get_key(UploadHistory.CACHE_KEY) or {}).get(uid)
+
+    def save(uid, state):
+        history = Cache.get_key(UploadHistory.CACHE_KEY) or {}
+        history[uid] = state
+        Cache.save_key(UploadHistory.CACHE_KEY, history)
+
+    def is_scene_unchanged(state, last_upload):
+        return last_upload is not None and all(state[key] == last_upload[key] for key in ("session", "changes", "settings"))
+
+def update_metadata(url, uid, state, last_upload):
+    """
+    Called instead of an upload when the scene did not change: only the title,
+    description and tags set in the panel that changed are sent
+    """
+    sf_state.model_url = Config.SKETCHFAB_URL + "/models/" + uid
+    state["fingerprint"] = last_upload["fingerprint"]
+    changes = get_metadata_changes(state, last_upload)
+    if not changes:
+        UploadHistory.save(uid, state)
+        return upload_report("The model did not change since the last upload, nothing was uploaded.", 'INFO')
+
+    error = patch_metadata(url, changes)
+    if error:
+        return upload_report("Update failed. %s" % error, 'WARNING')
+
+    UploadHistory.save(uid, state)
+    return upload_report("The model did not change, its title, description or tags were updated.", 'INFO')
+
 # upload the blend-file to sketchfab
-def upload(filepath, filename):
+def upload(filepath, filename, state=None):
 
     props = get_sketchfab_props()
     api   = props.skfb_api
@@ -2060,51 +4605,19 @@ def upload(filepath, filename):
         "source": "blender-exporter",
     }
 
-    _files = {
-        "modelFile": open(filepath, 'rb'),
-    }
-
-    _headers = api.headers
 
     uploadUrl = ""
     modelUid  = ""
-    requestFunction = requests.post
+    method = "POST"
 
     # Are we reuploading ?
     if props.reuploadBoolean:
 
-        requestFunction = requests.put
+        method = "PUT"
 
-        if "sketchfab.com/" not in props.reuploadPath:
-            return upload_report("reupload url is malformed %s" % props.reuploadPath, 'ERROR')
-
-        # Get the model uid
-        try:
-            modelUid = props.reuploadPath[-32:]
-            if not Utils.is_valid_uuid(modelUid):
-                return upload_report("reupload url does not end with a valid uid (32 characters string): %s" % props.reuploadPath, 'ERROR')
-        except:
-            return upload_report("reupload url is malformed %s" % props.reuploadPath, 'ERROR')
-
-        # If the model is in an org, find if the user has access to it
-        if "/orgs/" in props.reuploadPath:
-            if True:#try:
-                orgName = props.reuploadPath.split("/orgs/")[1].split("/")[0]
-                user_orgs = api.user_orgs
-                orgUid = ""
-                for org in user_orgs:
-                    if org["username"] == orgName:
-                        orgUid = org["uid"]
-                        break
-                if orgUid:
-                    uploadUrl = '{}/{}/models/{}'.format(Config.SKETCHFAB_ORGS, orgUid, modelUid)
-                else:
-                    return upload_report("User does not appear to belong to org %s" % (orgName), 'ERROR')
-            else:#aexcept:
-                return upload_report("Cannot parse the org name from the url %s" % props.reuploadPath, 'ERROR')
-        # Otherwise, request a direct reupload
-        else:
-            uploadUrl = '{}/{}'.format(Config.SKETCHFAB_MODEL, modelUid)
+        uploadUrl, modelUid, error = get_reupload_url(props.reuploadPath, api)
+        if error:
+            return upload_report(error, 'ERROR')
 
         _data = {
             "uid" : modelUid,
@@ -2120,27 +4633,112 @@ def upload(filepath, filename):
         else:
             uploadUrl = Config.SKETCHFAB_MODEL
 
-    # Upload and parse the result
-    try:
-        print("Uploading to %s" % uploadUrl)
-        r = requestFunction(
-            uploadUrl,
-            data    = _data,
-            files   = _files,
-            headers = _headers
-        )
-    except requests.exceptions.RequestException as e:
-        return upload_report("Upload failed. Error: %s" % str(e), 'WARNING')
+    # Only the last upload can be resumed
+    previous = sf_state.pending_upload
+    if previous is not None and previous["filepath"] != filepath:
+        PendingUpload.clear()
+        if os.path.exists(previous["filepath"]):
+            terminate(previous["filepath"])
+
+    # Kept until the upload succeeds, so that it can be resumed after a failure
+    record = {
+        "url": uploadUrl,
+        "method": method,
+        "fields": _data,
+        "filepath": filepath,
+        "filename": filename,
+        "modelUid": modelUid,
+        "state": state,
+    }
+    PendingUpload.save(record)
+    return send_upload(record)
+
+def is_request_unsent(error):
+    """
+    True if the request failed while connecting, before anything was sent
+    to the server
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+def send_upload(record):
+    """
+    Sends the prepared file, retrying with an exponential backoff on connection
+    errors and server errors. Client errors are not retried.
+    A new model can be created even when its response is lost, so a POST is only
+    retried when the server never received it, or rejected it with a 429
+    """
+    api = get_sketchfab_props().skfb_api
+    _headers = dict(api.headers)
+    delay = Config.UPLOAD_RETRY_DELAY
+
+    # The prepared file can be identical to the last one sent to the same model
+    state = record.get("state")
+    last_upload = UploadHistory.get(record["modelUid"]) if state is not None and record["modelUid"] else None
+    if state is not None:
+        state["fingerprint"] = Utils.hash_file(record["filepath"])
+        if last_upload is not None and last_upload["fingerprint"] == state["fingerprint"]:
+            PendingUpload.clear()
+            return update_metadata(record["url"], record["modelUid"], state, last_upload)
 
-    if r.status_code not in [requests.codes.ok, requests.codes.created, requests.codes.no_content]:
-        return upload_report("Upload failed. Error code: %s\nMessage:\n%s" % (str(r.status_code), str(r)), 'WARNING')
-    else:
+    # Upload and parse the result
+    for attempt in range(1, Config.UPLOAD_MAX_ATTEMPTS + 1):
+        body = StreamingUpload(record["fields"], "modelFile", record["filepath"], on_progress=update_upload_progress)
+        _headers["Content-Type"] = body.content_type
         try:
-            result = r.json()
-            sf_state.model_url = Config.SKETCHFAB_URL + "/models/" + result["uid"]
-        except:
-            sf_state.model_url = Config.SKETCHFAB_URL + "/models/" + modelUid
-        return upload_report("Upload complete. Available on your sketchfab.com dashboard.", 'INFO')
+            print("Uploading to %s" % record["url"])
+            r = requests.request(
+                record["method"],
+                record["url"],
+                data    = body,
+                headers = _headers
+            )
+        except requests.exceptions.RequestException as e:
+            error = "Upload failed. Error: %s" % str(e)
+            received = not is_request_unsent(e)
+        else:
+            print("Uploaded {} in {:.2f}s ({}/s)".format(Utils.humanify_size(body.size), body.elapsed, Utils.humanify_size(body.throughput)))
+            if r.status_code in [requests.codes.ok, requests.codes.created, requests.codes.no_content]:
+                break
+            error = "Upload failed. Error code: %s\nMessage:\n%s" % (str(r.status_code), str(r))
+            if r.status_code < 500 and r.status_code != requests.codes.too_many_requests:
+                PendingUpload.clear()
+                return upload_report(error, 'WARNING')
+            received = r.status_code != requests.codes.too_many_requests
+        finally:
+            body.close()
+
+        # Sending the model again could create a duplicate, reuploads only replace the file
+        if received and record["method"] == "POST":
+            return upload_report(error + "\nThe model may have been created anyway: check your sketchfab.com dashboard "
+                                 "before resuming the upload from the Export panel", 'WARNING')
+
+        if attempt < Config.UPLOAD_MAX_ATTEMPTS:
+            print("%s\nRetrying in %ds" % (error, delay))
+            time.sleep(delay)
+            delay *= 2
+    else:
+        return upload_report(error + "\nThe upload can be resumed from the Export panel", 'WARNING')
+
+    PendingUpload.clear()
+    try:
+        uid = r.json()["uid"]
+    except:
+        uid = record["modelUid"]
+    sf_state.model_url = Config.SKETCHFAB_URL + "/models/" + uid
+
+    if state is not None and uid:
+        # Reuploads only send the file, the metadata is updated separately
+        changes = get_metadata_changes(state, last_upload) if record["method"] == "PUT" else None
+        if changes:
+            error = patch_metadata(record["url"], changes)
+            if error:
+                # Not recorded in the history, so that the next reupload sends it again
+                return upload_report("Upload complete, but the title, description or tags could not be updated. %s" % error, 'WARNING')
+        UploadHistory.save(uid, state)
+    return upload_report("Upload complete. Available on your sketchfab.com dashboard.", 'INFO')
 
 
 class ExportSketchfab(bpy.types.Operator):
@@ -2150,30 +4748,191 @@ class ExportSketchfab(bpy.types.Operator):
 
     _timer = None
     _thread = None
+    _process = None
+    _progress = None
+    _tempdir = None
+    _ext = None
+    _time_start = 0.0
+    _compression = None
+    _compression_method = None
+    _compression_level = 0
+    _compression_result = None
+    _state = None
+
+    resume : BoolProperty(
+        name="Resume",
+        description="Send the file of the interrupted upload again",
+        default=False,
+        options={'SKIP_SAVE'}
+    )
 
     def modal(self, context, event):
         if event.type == 'TIMER':
+            if self._process is not None:
+                return self.poll_preparation(context)
+            if self._compression is not None:
+                return self.poll_compression(context)
+
+            redraw_export_panel(context)
             if not self._thread.is_alive():
                 wm = context.window_manager
                 props = wm.sketchfab_export
 
-                terminate(props.filepath)
-
-                if context.area:
-                    context.area.tag_redraw()
+                if props.filepath:
+                    terminate(props.filepath)
 
                 # forward message from upload thread
                 if not sf_state.report_type:
                     sf_state.report_type = 'ERROR'
                 self.report({sf_state.report_type}, sf_state.report_message)
 
-                wm.event_timer_remove(self._timer)
                 self._thread.join()
-                sf_state.uploading = False
-                return {'FINISHED'}
+                return self.finish(context)
 
         return {'PASS_THROUGH'}
 
+    def finish(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        sf_state.uploading = False
+        sf_state.preparing = False
+        sf_state.cancel_requested = False
+        sf_state.progress_label = ""
+        redraw_export_panel(context)
+        return {'FINISHED'}
+
+    def read_progress(self):
+        # Lines are read by a thread, the modal operator only shows the last state
+        while True:
+            try:
+                progress = self._progress.get_nowait()
+            except queue.Empty:
+                break
+            step = progress.get('step')
+            if step == 'pack':
+                sf_state.progress_label = "Packing images ({}/{})".format(progress['done'], progress['total'])
+            elif step == 'remove':
+                sf_state.progress_label = "Removed {} datablock(s)".format(progress['count'])
+            elif step == 'save':
+                sf_state.progress_label = "Saving"
+            elif step == 'saved':
+                sf_state.progress_label = "Saved {}".format(Utils.humanify_size(progress['size']))
+            elif step == 'shrink':
+                sf_state.progress_label = "Fitting to plan limit: shrinking {}".format(progress['name'])
+            elif step == 'compress':
+                sf_state.progress_label = "Compressing {}".format(Utils.humanify_size(progress['size']))
+            elif step == 'fit':
+                sf_state.progress_label = "Fitting to plan limit: step {}, {} / {}".format(
+                    progress['fit_step'], Utils.humanify_size(progress['size']), Utils.humanify_size(progress['limit']))
+
+    def poll_preparation(self, context):
+        self.read_progress()
+        redraw_export_panel(context)
+
+        if sf_state.cancel_requested:
+            self._process.terminate()
+            self._process.wait()
+            self._process = None
+            shutil.rmtree(self._tempdir, ignore_errors=True)
+            self.report({'INFO'}, "Export cancelled")
+            return self.finish(context)
+
+        returncode = self._process.poll()
+        if returncode is None:
+            return {'PASS_THROUGH'}
+        self._process = None
+
+        wm = context.window_manager
+        props = wm.sketchfab_export
+        data_file = os.path.join(self._tempdir, "export-sketchfab.json")
+        try:
+            if returncode != 0:
+                raise RuntimeError("pack_for_export.py exited with code {}".format(returncode))
+
+            os.remove(os.path.join(self._tempdir, "export-sketchfab" + self._ext))
+
+            # read subprocess call results
+            with open(data_file, 'r') as s:
+                r = json.load(s)
+                size = r["size"]
+                props.filepath = r["filepath"]
+                filename = r["filename"]
+                compressed = r["compressed"]
+
+            os.remove(data_file)
+
+        except Exception as e:
+            shutil.rmtree(self._tempdir, ignore_errors=True)
+            self.report({'WARNING'}, "Error occured while preparing your file: %s" % str(e))
+            return self.finish(context)
+
+        # Files fitted to the upload limit are already compressed
+        if compressed:
+            return self.start_upload(context, size, filename)
+        return self.start_compression(context, size, filename)
+
+    def start_compression(self, context, size, filename):
+        props = context.window_manager.sketchfab_export
+        if self._compression_method not in {'GZIP', 'ZSTD'}:
+            return self.start_upload(context, size, filename)
+
+        # Compressed in a thread, polled by the modal timer
+        sf_state.preparing = True
+        sf_state.progress_label = "Compressing %s" % Utils.humanify_size(size)
+        self._compression_result = {'filename': filename}
+        def run(result, filepath, method, level):
+            try:
+                result['size'] = compress_blend_file(filepath, method, level)
+            except Exception as e:
+                result['error'] = str(e)
+        self._compression = threading.Thread(
+                target=run,
+                args=(self._compression_result, props.filepath, self._compression_method, self._compression_level),
+                )
+        self._compression.start()
+        return {'RUNNING_MODAL'}
+
+    def poll_compression(self, context):
+        redraw_export_panel(context)
+        if self._compression.is_alive():
+            return {'PASS_THROUGH'}
+        self._compression = None
+
+        result = self._compression_result
+        if sf_state.cancel_requested or 'error' in result:
+            shutil.rmtree(self._tempdir, ignore_errors=True)
+            if 'error' in result:
+                self.report({'WARNING'}, "Error occured while compressing your file: %s" % result['error'])
+            else:
+                self.report({'INFO'}, "Export cancelled")
+            return self.finish(context)
+        return self.start_upload(context, result['size'], result['filename'])
+
+    def start_upload(self, context, size, filename):
+        props = context.window_manager.sketchfab_export
+
+        # Report the trade-off of the compression setting
+        self.report({'INFO'}, "Prepared %s in %.2fs (compression: %s)" % (
+            Utils.humanify_size(size), time.perf_counter() - self._time_start, self._compression_method.lower()))
+
+        # Check the generated file size against the user plans, to know if the upload will succeed
+        upload_limit = get_upload_limit()
+        if size > upload_limit:
+            human_size_limit    = Utils.humanify_size(upload_limit)
+            human_exported_size = Utils.humanify_size(size)
+            self.report({'ERROR'}, "Upload size is above your plan upload limit: %s > %s" % (human_exported_size, human_size_limit))
+            return self.finish(context)
+
+        sf_state.preparing = False
+        sf_state.size_label = Utils.humanify_size(size)
+        sf_state.bytes_sent = 0
+        sf_state.upload_size = 0
+        self._thread = threading.Thread(
+                target=upload,
+                args=(props.filepath, filename, self._state),
+                )
+        self._thread.start()
+        return {'RUNNING_MODAL'}
+
     def execute(self, context):
 
         if sf_state.uploading:
@@ -2184,6 +4943,28 @@ class ExportSketchfab(bpy.types.Operator):
         props = wm.sketchfab_export
         sf_state.model_url = ""
 
+        if self.resume:
+            return self.resume_upload(context)
+
+        # The settings can be changed while the file is prepared, the ones of this export are kept
+        self._compression_method = props.compression
+        self._compression_level = props.compression_level
+
+        # Nothing to prepare if the scene did not change since the last upload
+        self._state = get_upload_state(props)
+        if props.reuploadBoolean:
+            url, uid, error = get_reupload_url(props.reuploadPath, get_sketchfab_props().skfb_api)
+            last_upload = UploadHistory.get(uid) if not error else None
+            if UploadHistory.is_scene_unchanged(self._state, last_upload):
+                props.filepath = ""
+                sf_state.uploading = True
+                self._time_start = time.perf_counter()
+                self._thread = threading.Thread(target=update_metadata, args=(url, uid, self._state, last_upload))
+                self._thread.start()
+                wm.modal_handler_add(self)
+                self._timer = wm.event_timer_add(Config.EXPORT_POLL_INTERVAL, window=context.window)
+                return {'RUNNING_MODAL'}
+
         # Prepare to save the file
         binary_path = bpy.app.binary_path
         script_path = os.path.dirname(os.path.realpath(__file__))
@@ -2197,66 +4978,152 @@ class ExportSketchfab(bpy.types.Operator):
 
         SKETCHFAB_EXPORT_DATA_FILE = os.path.join(tempdir, "export-sketchfab.json")
 
-        try:
-            # save a copy of actual scene but don't interfere with the users models
-            bpy.ops.wm.save_as_mainfile(filepath=filepath, compress=True, copy=True)
-
-            with open(SKETCHFAB_EXPORT_DATA_FILE, 'w') as s:
-                json.dump({
-                        "selection": props.selection,
-                        }, s)
-
-            subprocess.check_call([
-                    binary_path,
-                    "--background",
-                    "-noaudio",
-                    filepath,
-                    "--python", os.path.join(script_path, "pack_for_export.py"),
-                    "--", tempdir
-                    ])
-
-            os.remove(filepath)
-
-            # read subprocess call results
-            with open(SKETCHFAB_EXPORT_DATA_FILE, 'r') as s:
-                r = json.load(s)
-                size = r["size"]
-                props.filepath = r["filepath"]
-                filename = r["filename"]
+        self._tempdir = tempdir
+        self._ext = ext
+        self._time_start = time.perf_counter()
+        sf_state.uploading = True
+        sf_state.cancel_requested = False
 
-            os.remove(SKETCHFAB_EXPORT_DATA_FILE)
+        try:
+            # Without selection, pack_for_export has nothing to change: the
+            # uploaded file is written in a single pass, without a second Blender
+            if not props.selection and not props.fit_to_limit:
+                filename = time.strftime("Sketchfab_%Y_%m_%d_%H_%M_%S.blend", time.localtime(time.time()))
+                props.filepath = os.path.join(tempdir, filename)
+                bpy.ops.wm.save_as_mainfile(filepath=props.filepath, compress=self._compression_method == 'BLENDER', copy=True)
+                size = os.path.getsize(props.filepath)
+            else:
+                # save a copy of actual scene but don't interfere with the users models
+                # It is only read once by pack_for_export, so it is not compressed
+                bpy.ops.wm.save_as_mainfile(filepath=filepath, compress=False, copy=True)
+
+                with open(SKETCHFAB_EXPORT_DATA_FILE, 'w') as s:
+                    json.dump({
+                            "selection": props.selection,
+                            "compress": self._compression_method == 'BLENDER',
+                            "size_limit": get_upload_limit() if props.fit_to_limit else 0,
+                            "compression": self._compression_method,
+                            "compression_level": self._compression_level,
+                            "addon": __name__,
+                            "addon_path": os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+                            }, s)
+
+                # The file is prepared in the background, the modal timer polls the process
+                self._process = subprocess.Popen([
+                        binary_path,
+                        "--background",
+                        "-noaudio",
+                        filepath,
+                        "--python", os.path.join(script_path, "pack_for_export.py"),
+                        "--", tempdir
+                        ], stdout=subprocess.PIPE, universal_newlines=True, bufsize=1)
+                self._progress = queue.Queue()
+                threading.Thread(target=read_export_progress, args=(self._process, self._progress), daemon=True).start()
+                sf_state.preparing = True
+                sf_state.progress_label = "Preparing file"
 
         except Exception as e:
+            sf_state.uploading = False
+            shutil.rmtree(tempdir, ignore_errors=True)
             self.report({'WARNING'}, "Error occured while preparing your file: %s" % str(e))
             return {'FINISHED'}
 
-        # Check the generated file size against the user plans, to know if the upload will succeed
-        upload_limit = Config.SKETCHFAB_UPLOAD_LIMITS[get_sketchfab_props().skfb_api.plan_type]
-        if get_sketchfab_props().skfb_api.use_org_profile:
-            upload_limit = Config.SKETCHFAB_UPLOAD_LIMITS["ent"]
-        if size > upload_limit:
-            human_size_limit    = Utils.humanify_size(upload_limit)
-            human_exported_size = Utils.humanify_size(size)
-            self.report({'ERROR'}, "Upload size is above your plan upload limit: %s > %s" % (human_exported_size, human_size_limit))
-            return {'FINISHED'}
+        wm.modal_handler_add(self)
+        self._timer = wm.event_timer_add(Config.EXPORT_POLL_INTERVAL, window=context.window)
+
+        if self._process is None:
+            return self.start_compression(context, size, filename)
+        return {'RUNNING_MODAL'}
+
+    def resume_upload(self, context):
+        record = sf_state.pending_upload
+        if record is None:
+            return {'CANCELLED'}
 
+        wm = context.window_manager
+        wm.sketchfab_export.filepath = record["filepath"]
         sf_state.uploading = True
-        sf_state.size_label = Utils.humanify_size(size)
-        self._thread = threading.Thread(
-                target=upload,
-                args=(props.filepath, filename),
-                )
+        sf_state.size_label = Utils.humanify_size(os.path.getsize(record["filepath"]))
+        sf_state.bytes_sent = 0
+        sf_state.upload_size = 0
+        self._thread = threading.Thread(target=send_upload, args=(record,))
         self._thread.start()
 
         wm.modal_handler_add(self)
-        self._timer = wm.event_timer_add(1.0, window=context.window)
-        
+        self._timer = wm.event_timer_add(Config.EXPORT_POLL_INTERVAL, window=context.window)
         return {'RUNNING_MODAL'}
 
     def cancel(self, context):
         wm = context.window_manager
         wm.event_timer_remove(self._timer)
-        self._thread.join()
+        if self._process is not None:
+            self._process.terminate()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def read_export_progress(process, progress):
+    """
+    Forwards the progress lines of pack_for_export.py, and prints the others
+    """
+    for line in process.stdout:
+        if line.startswith(Config.SKETCHFAB_PROGRESS_PREFIX):
+            try:
+                progress.put(json.loads(line[len(Config.SKETCHFAB_PROGRESS_PREFIX):]))
+                continue
+            except ValueError:
+                pass
+        print(line, end='')
+
+def redraw_export_panel(context):
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+class SketchfabEstimateSize(bpy.types.Operator):
+    """Estimate the size of the uploaded file, and list its largest datablocks"""
+    bl_idname = "wm.sketchfab_estimate_size"
+    bl_label = "Estimate size"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        time_start = time.perf_counter()
+        total, breakdown = estimate_export_size(context.window_manager.sketchfab_export.selection)
+        sf_state.size_estimate = {
+            'total': total,
+            'breakdown': breakdown[:Config.SIZE_ESTIMATE_SHOWN],
+            'count': len(breakdown),
+        }
+        print("Estimated the upload size ({}) in {:.3f}s".format(Utils.humanify_size(total), time.perf_counter() - time_start))
+        return {'FINISHED'}
+
+
+class SketchfabDiscardUpload(bpy.types.Operator):
+    """Remove the file of the interrupted upload"""
+    bl_idname = "wm.sketchfab_discard_upload"
+    bl_label = "Discard"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        record = sf_state.pending_upload
+        if record is not None:
+            PendingUpload.clear()
+            if os.path.exists(record["filepath"]):
+                terminate(record["filepath"])
+        return {'FINISHED'}
+
+
+class SketchfabCancelExport(bpy.types.Operator):
+    """Stop preparing the file to upload"""
+    bl_idname = "wm.sketchfab_export_cancel"
+    bl_label = "Cancel"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        sf_state.cancel_requested = True
+        return {'FINISHED'}
 
 def get_temporary_path():
 
@@ -2318,10 +5185,104 @@ class SketchfabAddonPreferences(bpy.types.AddonPreferences):
         ),
         subtype='FILE_PATH'
     )
+    useLibrary : BoolProperty(
+        name="Keep downloaded models",
+        description=(
+            "Keep downloaded archives in a persistent library, so that\n"
+            "importing the same model again does not download it again"
+        ),
+        default=True
+    )
+    libraryPath : StringProperty(
+        name="Library folder",
+        description=(
+            "Directory where downloaded archives are kept\n"
+            "Stored next to the plugin cache if left empty"
+        ),
+        subtype='DIR_PATH'
+    )
+    libraryImportMode : EnumProperty(
+        name="Reuse imported models",
+        items=(('NONE', "No", "Always import the glTF file"),
+               ('APPEND', "Append", "Keep a .blend file of imported models, and append it on next imports"),
+               ('LINK', "Link", "Keep a .blend file of imported models, and link it as a collection instance on next imports.\n"
+                                "Linked files are kept in the 'linked' folder of the library, which is never cleaned up automatically")),
+        description="Keep a .blend file of every imported model in the library, to import it again instantly",
+        default='NONE'
+    )
+    libraryQuota : IntProperty(
+        name="Library size (MB)",
+        description="Least recently imported models are removed from the library above this size",
+        default=2048,
+        min=0
+    )
+    useBackgroundImport : BoolProperty(
+        name="Import in background",
+        description=(
+            "Import models in separate Blender processes and append the result,\n"
+            "to keep working while large models are being imported"
+        ),
+        default=False
+    )
+    importWorkers : IntProperty(
+        name="Background imports",
+        description="Number of models imported in parallel in the background",
+        default=2,
+        min=1,
+        max=16
+    )
+    useImportReports : BoolProperty(
+        name="Import reports",
+        description=(
+            "Record the time, memory and data used by every import\n"
+            "Reports are shown in the Import report panel, and saved next\n"
+            "to the download history file (<history>_imports.csv) if set"
+        ),
+        default=False
+    )
+    bandwidthLimit : IntProperty(
+        name="Bandwidth limit (MB/s)",
+        description=(
+            "Maximum download rate of the plugin, 0 for no limit\n"
+            "Browsing keeps most of the bandwidth while models are downloading"
+        ),
+        default=0,
+        min=0,
+        update=updateBandwidthLimit
+    )
     def draw(self, context):
         layout = self.layout
         layout.prop(self, "cachePath", text="Download directory")
         layout.prop(self, "downloadHistory", text="Download history (.csv)")
+        layout.prop(self, "useImportReports")
+        layout.prop(self, "bandwidthLimit")
+
+        row = layout.row()
+        row.prop(self, "useBackgroundImport")
+        sub = row.row()
+        sub.enabled = self.useBackgroundImport
+        sub.prop(self, "importWorkers")
+
+        col = layout.box().column(align=True)
+        col.prop(self, "useLibrary")
+        if self.useLibrary:
+            col.prop(self, "libraryPath", text="Library directory")
+            col.prop(self, "libraryQuota")
+            col.prop(self, "libraryImportMode")
+            model_count, library_size = ModelLibrary.get_stats()
+            row = col.row()
+            row.label(text="{} model(s) in library ({})".format(model_count, Utils.humanify_size(library_size)))
+            row.operator("wm.skfb_clear_library", text="Clear library", icon='TRASH')
+
+class SketchfabClearLibrary(bpy.types.Operator):
+    """Remove all the models kept in the download library, except the files linked by scenes"""
+    bl_idname = "wm.skfb_clear_library"
+    bl_label = "Sketchfab"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        ModelLibrary.clear()
+        return {'FINISHED'}
 
 classes = (
     SketchfabAddonPreferences,
@@ -2336,6 +5297,7 @@ classes = (
     LoginPanel,
     TeamsPanel,
     SketchfabBrowse,
+    SketchfabImportReportPanel,
     SketchfabExportPanel,
     SketchfabPanel,
 
@@ -2352,8 +5314,14 @@ classes = (
     ImportModalOperator,
     ViewOnSketchfab,
     SketchfabDownloadModel,
+    SketchfabBatchSelect,
+    SketchfabBatchImport,
     SketchfabLogger,
     ExportSketchfab,
+    SketchfabCancelExport,
+    SketchfabDiscardUpload,
+    SketchfabEstimateSize,
+    SketchfabClearLibrary,
     )
 
 def check_plugin_version(request, *args, **kwargs):
@@ -2404,8 +5372,23 @@ def register():
 
     # If a cache path was set in preferences, use it
     updateCacheDirectory(None, context=bpy.context)
+    updateBandwidthLimit(None, context=bpy.context)
+    PendingUpload.load()
+
+    bpy.app.timers.register(execute_queued_functions, persistent=True)
+    bpy.app.handlers.depsgraph_update_post.append(count_scene_changes)
+    bpy.app.handlers.load_post.append(start_export_session)
 
 def unregister():
+    if count_scene_changes in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(count_scene_changes)
+    if start_export_session in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(start_export_session)
+
+    for timer in [execute_queued_functions, update_import_workers, update_batch_import]:
+        if bpy.app.timers.is_registered(timer):
+            bpy.app.timers.unregister(timer)
+
     for cls in classes:
         bpy.utils.unregister_class(cls)
 
@@ -0,0 +1,117 @@
+"""
+Copyright 2026 Sketchfab
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Detects the objects of an import and cleans their hierarchy, as ImportModalOperator
+# does after a glTF import, on hierarchies of 10k to 100k objects. The previous
+# implementation (names of the existing objects in a list, Object.children) is
+# measured on the same hierarchies.
+# Run it with Blender, or with the bpy module:
+#   blender --background --factory-startup --python benchmarks/clean_node_hierarchy.py -- --objects 10000,30000,100000
+#   python benchmarks/clean_node_hierarchy.py -- --objects 10000,30000,100000
+
+import os
+import sys
+import time
+import argparse
+import importlib
+
+import bpy
+
+def load_addon():
+    addon_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.append(os.path.dirname(addon_dir))
+    return importlib.import_module(os.path.basename(addon_dir))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark of the imported hierarchy cleanup")
+    parser.add_argument("--objects", default="10000,30000,100000", help="number of imported objects to measure")
+    parser.add_argument("--existing", type=int, default=1000, help="objects already in the file before the import")
+    return parser.parse_args(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+
+def reset_file(existing):
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    mesh = bpy.data.meshes.new("Existing")
+    for i in range(existing):
+        bpy.context.scene.collection.objects.link(bpy.data.objects.new("Existing", mesh))
+
+# same layout as the glTF importer: a chain of empties above the meshes of the model
+def add_imported_hierarchy(count):
+    collection = bpy.context.scene.collection
+    mesh = bpy.data.meshes.new("Mesh")
+    parent = None
+    for name in ("Sketchfab_model", "root", "GLTF_SceneRootNode"):
+        empty = bpy.data.objects.new(name, None)
+        empty.parent = parent
+        collection.objects.link(empty)
+        parent = empty
+    for i in range(count - 3):
+        ob = bpy.data.objects.new("Object_{}".format(i), mesh)
+        ob.parent = parent
+        collection.objects.link(ob)
+
+def clean_previous(root_name, old_objects):
+    objects = [o for o in bpy.data.objects if o.name not in old_objects]
+    root = None
+    for object in objects:
+        if object.parent is None:
+            root = object
+    while True:
+        children = root.children
+        if len(children) == 1 and children[0].type in ("EMPTY", "MESH"):
+            matrixcopy = children[0].matrix_world.copy()
+            children[0].parent = None
+            children[0].matrix_world = matrixcopy
+            bpy.data.objects.remove(root)
+            root = children[0]
+            if root.type == "MESH":
+                break
+        else:
+            break
+    root.name = root_name
+
+def measure(addon, count, existing, previous):
+    reset_file(existing)
+    start = time.perf_counter()
+    if previous:
+        old_objects = [o.name for o in bpy.data.objects]
+    else:
+        old_objects = set(o.as_pointer() for o in bpy.data.objects)
+    snapshot = time.perf_counter() - start
+
+    add_imported_hierarchy(count)
+
+    start = time.perf_counter()
+    if previous:
+        clean_previous("Model", old_objects)
+    else:
+        addon.Utils.clean_node_hierarchy([o for o in bpy.data.objects if o.as_pointer() not in old_objects], "Model")
+    cleanup = time.perf_counter() - start
+
+    assert "GLTF_SceneRootNode" not in bpy.data.objects and "Model" in bpy.data.objects
+    return snapshot + cleanup
+
+def main():
+    args = parse_args()
+    addon = load_addon()
+
+    print("{:>10} {:>16} {:>16}".format("objects", "current (s)", "previous (s)"))
+    for count in [int(c) for c in args.objects.split(',')]:
+        current = measure(addon, count, args.existing, False)
+        previous = measure(addon, count, args.existing, True)
+        print("{:>10} {:>16.3f} {:>16.3f}".format(count, current, previous))
+
+if __name__ == "__main__":
+    main()
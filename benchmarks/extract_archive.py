@@ -0,0 +1,90 @@
+"""
+Copyright 2026 Sketchfab
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Extracts a synthetic texture-heavy archive with extract_archive, using 1 to 8 threads.
+# Run it with Blender, or with the bpy module:
+#   blender --background --factory-startup --python benchmarks/extract_archive.py -- --textures 32 --size 8
+#   python benchmarks/extract_archive.py -- --textures 32 --size 8
+
+import os
+import sys
+import time
+import shutil
+import zipfile
+import argparse
+import tempfile
+import importlib
+
+def load_addon():
+    addon_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.append(os.path.dirname(addon_dir))
+    return importlib.import_module(os.path.basename(addon_dir))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark of the multithreaded archive extraction")
+    parser.add_argument("--textures", type=int, default=32, help="number of textures in the archive")
+    parser.add_argument("--size", type=int, default=8, help="size of each texture, in MB")
+    parser.add_argument("--workers", default="1,2,4,8", help="thread counts to measure")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per thread count, the fastest is kept")
+    return parser.parse_args(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+
+# random bytes over 16 values: deflate halves them, so inflating costs as much as real textures
+def make_texture(size):
+    table = bytes(i % 16 for i in range(256))
+    return os.urandom(size).translate(table)
+
+def make_archive(archive_path, textures, size):
+    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        zip_ref.writestr('scene.gltf', '{}')
+        zip_ref.writestr('scene.bin', make_texture(size))
+        for i in range(textures):
+            zip_ref.writestr('textures/texture_{}.png'.format(i), make_texture(size))
+    with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+        return sum(info.file_size for info in zip_ref.infolist())
+
+def main():
+    args = parse_args()
+    addon = load_addon()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        archive_path = os.path.join(temp_dir, 'archive.zip')
+        extract_dir = os.path.join(temp_dir, 'extracted')
+        total_size = make_archive(archive_path, args.textures, args.size * 1024 * 1024)
+        print("Archive: {} textures, {} extracted, {} compressed, {} processor(s)".format(
+            args.textures, addon.Utils.humanify_size(total_size),
+            addon.Utils.humanify_size(os.path.getsize(archive_path)), os.cpu_count()))
+
+        results = []
+        for workers in [int(w) for w in args.workers.split(',')]:
+            addon.Config.EXTRACT_WORKERS = workers
+            timings = []
+            for _ in range(args.repeat):
+                shutil.rmtree(extract_dir, ignore_errors=True)
+                start = time.perf_counter()
+                addon.extract_archive(archive_path, extract_dir)
+                timings.append(time.perf_counter() - start)
+            results.append((workers, min(timings)))
+
+        print("\n{:>8} {:>10} {:>12} {:>8}".format("threads", "time (s)", "MB/s", "speedup"))
+        for workers, elapsed in results:
+            print("{:>8} {:>10.3f} {:>12.1f} {:>7.2f}x".format(
+                workers, elapsed, total_size / elapsed / 1024 / 1024, results[0][1] / elapsed))
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Copyright 2026 Sketchfab
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Sends uploads with send_upload to a local stand-in of the Data API, which answers
+# each request with the next status of a scenario, and checks the retries, the client
+# errors, the POSTs that are not sent again and the resume of an upload from the cache.
+# Nothing is sent to sketchfab.com, and the plugin cache is left untouched.
+# Run it with Blender, or with the bpy module:
+#   blender --background --factory-startup --python benchmarks/upload_retries.py
+#   python benchmarks/upload_retries.py
+
+import os
+import sys
+import json
+import socket
+import shutil
+import tempfile
+import threading
+import importlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import bpy
+import addon_utils
+
+def load_addon():
+    addon_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.append(os.path.dirname(addon_dir))
+    addon_utils.enable(os.path.basename(addon_dir), default_set=True)
+    return importlib.import_module(os.path.basename(addon_dir))
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def handle_upload(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.requests.append(self.command)
+        status = self.server.statuses.pop(0) if self.server.statuses else 201
+        body = json.dumps({"uid": "0123456789abcdef0123456789abcdef"}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = handle_upload
+    do_PUT = handle_upload
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(port, statuses):
+    server = ThreadingHTTPServer(('127.0.0.1', port), StandInHandler)
+    server.statuses = list(statuses)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def get_free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def make_record(addon, temp_dir, port, method):
+    filepath = os.path.join(temp_dir, 'upload.blend')
+    with open(filepath, 'wb') as f:
+        f.write(os.urandom(64 * 1024))
+    record = {
+        "url": "http://127.0.0.1:{}/v3/models".format(port),
+        "method": method,
+        "fields": {"source": "blender-exporter"},
+        "filepath": filepath,
+        "filename": "upload.blend",
+        "modelUid": "",
+        "state": None,
+    }
+    addon.PendingUpload.save(record)
+    return record
+
+def run(addon, record):
+    addon.sf_state.report_message = ''
+    addon.sf_state.report_type = ''
+    addon.send_upload(record)
+    return addon.sf_state.report_type, addon.sf_state.report_message
+
+def check(name, condition, details):
+    print("{:<48} {}".format(name, "ok" if condition else "FAILED\n    {}".format(details)))
+    return condition
+
+def main():
+    addon = load_addon()
+    temp_dir = tempfile.mkdtemp()
+    addon.Cache.SKETCHFAB_CACHE_FILE = os.path.join(temp_dir, 'cache.json')
+    addon.Config.UPLOAD_RETRY_DELAY = 0
+    attempts = addon.Config.UPLOAD_MAX_ATTEMPTS
+    results = []
+
+    try:
+        # A reupload only replaces the file, it is retried on server errors
+        port = get_free_port()
+        server = start_server(port, [503] * (attempts - 1))
+        report = run(addon, make_record(addon, temp_dir, port, "PUT"))
+        results.append(check("PUT retried on server errors",
+            report[0] == 'INFO' and len(server.requests) == attempts and addon.sf_state.pending_upload is None,
+            (report, server.requests)))
+        server.shutdown()
+
+        # The model may have been created, the POST is not sent again
+        port = get_free_port()
+        server = start_server(port, [503])
+        report = run(addon, make_record(addon, temp_dir, port, "POST"))
+        results.append(check("POST not retried on server errors",
+            report[0] == 'WARNING' and 'dashboard' in report[1] and len(server.requests) == 1
+            and addon.sf_state.pending_upload is not None,
+            (report, server.requests)))
+        server.shutdown()
+
+        # Rejected without being processed
+        port = get_free_port()
+        server = start_server(port, [429])
+        report = run(addon, make_record(addon, temp_dir, port, "POST"))
+        results.append(check("POST retried on 429",
+            report[0] == 'INFO' and len(server.requests) == 2, (report, server.requests)))
+        server.shutdown()
+
+        # Client errors are final, the prepared file is not kept
+        port = get_free_port()
+        server = start_server(port, [400])
+        report = run(addon, make_record(addon, temp_dir, port, "POST"))
+        results.append(check("Client error not retried",
+            report[0] == 'WARNING' and len(server.requests) == 1 and addon.sf_state.pending_upload is None
+            and addon.Cache.get_key(addon.PendingUpload.CACHE_KEY) is None,
+            (report, server.requests)))
+        server.shutdown()
+
+        # Nothing listens on the port: the POST never reaches a server and is retried
+        port = get_free_port()
+        report = run(addon, make_record(addon, temp_dir, port, "POST"))
+        results.append(check("POST retried on connection errors",
+            report[0] == 'WARNING' and 'resumed' in report[1] and 'dashboard' not in report[1]
+            and addon.sf_state.pending_upload is not None,
+            report))
+
+        # The interrupted upload is read back from the cache, as after a restart
+        addon.sf_state.pending_upload = None
+        addon.PendingUpload.load()
+        server = start_server(port, [])
+        record = addon.sf_state.pending_upload
+        report = run(addon, record) if record is not None else (None, "No pending upload in the cache")
+        results.append(check("Upload resumed from the cache",
+            report[0] == 'INFO' and len(server.requests) == 1 and addon.sf_state.pending_upload is None
+            and addon.Cache.get_key(addon.PendingUpload.CACHE_KEY) is None,
+            (report, server.requests)))
+        server.shutdown()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print("\n{}/{} checks passed".format(sum(results), len(results)))
+    if not all(results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Copyright 2026 Sketchfab
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import bpy
+import json
+import sys
+import time
+
+# read on demand, so that the addon can import this module to resize textures itself
+def get_temp_dir():
+    return sys.argv[sys.argv.index("--") + 1]
+
+def get_data_file():
+    return os.path.join(get_temp_dir(), "downscale-sketchfab.json")
+
+# resize the textures in place, keeping their file format
+def downscale_textures(oversized):
+    start = time.perf_counter()
+    for path, size in oversized:
+        img = bpy.data.images.load(path)
+        try:
+            img.scale(*size)
+            img.save()
+        finally:
+            bpy.data.images.remove(img)
+    print('Downscaled {} texture(s) in {:.2f}s'.format(len(oversized), time.perf_counter() - start))
+
+def read_settings():
+    with open(get_data_file(), 'r') as s:
+        return json.load(s)
+
+
+if __name__ == "__main__":
+    try:
+        downscale_settings = read_settings()
+        downscale_textures(downscale_settings['oversized'])
+    except:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,79 @@
+"""
+Copyright 2022 Sketchfab
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import bpy
+import json
+import sys
+import importlib
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+SKETCHFAB_IMPORT_TEMP_DIR = sys.argv[sys.argv.index("--") + 1]
+SKETCHFAB_IMPORT_DATA_FILE = os.path.join(SKETCHFAB_IMPORT_TEMP_DIR, "import-sketchfab.json")
+
+# import the glTF file in an empty file, and group the model in a collection
+def import_model(import_settings):
+    bpy.ops.wm.read_homefile(use_empty=True)
+
+    bpy.ops.import_scene.gltf(filepath=import_settings['gltf_path'])
+    objects = list(bpy.context.scene.collection.all_objects)
+
+    # Reuse the hierarchy cleanup of the addon
+    sys.path.append(import_settings['addon_path'])
+    addon = importlib.import_module(import_settings['addon'])
+    addon.Utils.clean_node_hierarchy(objects, import_settings['title'])
+    if import_settings['deduplicate_meshes']:
+        addon.Utils.deduplicate_meshes(list(bpy.context.scene.collection.all_objects))
+
+    collection = bpy.data.collections.new(import_settings['title'])
+    bpy.context.scene.collection.children.link(collection)
+    for ob in list(bpy.context.scene.collection.all_objects):
+        for users_collection in ob.users_collection:
+            users_collection.objects.unlink(ob)
+        collection.objects.link(ob)
+
+    return collection.name
+
+# save the imported model, uncompressed to be appended faster
+def save_library(import_settings):
+    filepath = os.path.join(SKETCHFAB_IMPORT_TEMP_DIR, "import-sketchfab.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=filepath,
+                                compress=False)
+    return filepath
+
+def read_settings():
+    with open(SKETCHFAB_IMPORT_DATA_FILE, 'r') as s:
+        return json.load(s)
+
+def write_result(filepath, collection):
+    with open(SKETCHFAB_IMPORT_DATA_FILE, 'w') as s:
+        json.dump({
+                'filepath': filepath,
+                'collection': collection,
+                }, s)
+
+
+if __name__ == "__main__":
+    try:
+        import_settings = read_settings()
+        collection = import_model(import_settings)
+        filepath = save_library(import_settings)
+        write_result(filepath, collection)
+    except:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -18,26 +18,114 @@ import os
 import bpy
 import json
 import sys
+import importlib
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-SKETCHFAB_EXPORT_TEMP_DIR = sys.argv[7]
-SKETCHFAB_EXPORT_DATA_FILE = os.path.join(SKETCHFAB_EXPORT_TEMP_DIR, "export-sketchfab.json")
+# Lines starting with this prefix are parsed by the addon to display the progress
+SKETCHFAB_PROGRESS_PREFIX = "SKETCHFAB_PROGRESS "
+
+# Image files are read concurrently, which helps most on network storage
+SKETCHFAB_READ_WORKERS = 16
+
+# Textures are halved until the file fits in the upload limit, down to this size
+SKETCHFAB_MIN_TEXTURE_SIZE = 256
+SKETCHFAB_MAX_FIT_STEPS = 8
+# Shrunk textures keep their format, lossy ones are recompressed at this quality
+SKETCHFAB_LOSSY_FORMATS = {'JPEG', 'WEBP'}
+SKETCHFAB_LOSSY_QUALITY = 85
+
+def get_temp_dir():
+    return sys.argv[sys.argv.index("--") + 1]
+
+def get_data_file():
+    return os.path.join(get_temp_dir(), "export-sketchfab.json")
+
+def report_progress(step, **kwargs):
+    kwargs['step'] = step
+    print(SKETCHFAB_PROGRESS_PREFIX + json.dumps(kwargs), flush=True)
 
 # save a copy of the current blendfile
-def save_blend_copy():
+def save_blend_copy(compress=True):
     import time
 
-    filepath = SKETCHFAB_EXPORT_TEMP_DIR
+    filepath = get_temp_dir()
     filename = time.strftime("Sketchfab_%Y_%m_%d_%H_%M_%S.blend",
                              time.localtime(time.time()))
     filepath = os.path.join(filepath, filename)
+    report_progress('save')
     bpy.ops.wm.save_as_mainfile(filepath=filepath,
-                                compress=True,
+                                compress=compress,
                                 copy=True)
     size = os.path.getsize(filepath)
+    report_progress('saved', size=size)
     return (filepath, filename, size)
 
+# read an image file in a worker thread
+def read_image_file(filepath):
+    import time
+
+    start = time.perf_counter()
+    try:
+        with open(filepath, 'rb') as f:
+            data = f.read()
+    except OSError:
+        data = None
+    return data, time.perf_counter() - start
+
+# pack images from their file contents, read in parallel
+def pack_images(images):
+    import time
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    # Only single files can be packed from memory, other images are packed by Blender
+    files = {}
+    others = []
+    for img in images:
+        filepath = bpy.path.abspath(img.filepath, library=img.library)
+        if img.source == 'FILE' and os.path.isfile(filepath):
+            files[img] = filepath
+        else:
+            others.append(img)
+
+    done = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(SKETCHFAB_READ_WORKERS) as executor:
+        futures = {executor.submit(read_image_file, filepath): img for img, filepath in files.items()}
+
+        # Images are packed on the main thread, as soon as they are read
+        for future in as_completed(futures):
+            img = futures[future]
+            data, read_time = future.result()
+            pack_start = time.perf_counter()
+            try:
+                if data:
+                    img.pack(data=data, data_len=len(data))
+                else:
+                    # Invalid file, let Blender report it
+                    img.pack()
+            except:
+                # can fail in rare cases
+                import traceback
+                traceback.print_exc()
+            done += 1
+            print("Packed {} ({} bytes): read in {:.3f}s, packed in {:.3f}s".format(
+                  img.name, len(data) if data else 0, read_time, time.perf_counter() - pack_start))
+            report_progress('pack', done=done, total=len(images))
+
+    for img in others:
+        try:
+            img.pack()
+        except:
+            # can fail in rare cases
+            import traceback
+            traceback.print_exc()
+        done += 1
+        report_progress('pack', done=done, total=len(images))
+
+    if images:
+        print("Packed {} images in {:.2f}s".format(len(images), time.perf_counter() - start))
+
 # change visibility statuses and pack images
 def prepare_assets(export_settings):
     hidden = set()
@@ -77,51 +165,188 @@ def prepare_assets(export_settings):
                     ob.hide_set(True)
                     hidden.add(ob)
 
-    for img in images:
-        if not img.packed_file:
-            try:
-                img.pack()
-            except:
-                # can fail in rare cases
-                import traceback
-                traceback.print_exc()
+    pack_images([img for img in images if not img.packed_file])
 
     for ob in hidden:
         bpy.data.objects.remove(ob)
 
     # delete unused materials and associated textures (will remove unneeded packed images)
+    removed = 0
     for m in bpy.data.meshes:
         if m.users == 0:
             bpy.data.meshes.remove(m)
+            removed += 1
     for m in bpy.data.materials:
         if m.users == 0:
             bpy.data.materials.remove(m)
+            removed += 1
     for t in bpy.data.images:
         if t.users == 0:
             bpy.data.images.remove(t)
+            removed += 1
+    report_progress('remove', count=removed + len(hidden))
+
+# estimated size of an image in the saved file
+def get_image_size(img):
+    if img.packed_file:
+        return img.packed_file.size
+    filepath = bpy.path.abspath(img.filepath, library=img.library)
+    if img.source == 'FILE' and os.path.isfile(filepath):
+        return os.path.getsize(filepath)
+    return 0
+
+# estimated size of a mesh in the saved file, from the size of its buffers
+def get_mesh_size(mesh):
+    loops = len(mesh.loops)
+    return (12 * len(mesh.vertices) + 8 * len(mesh.edges) + 8 * loops
+            + 12 * len(mesh.polygons) + 8 * loops * len(mesh.uv_layers))
+
+# estimated contribution of each image and mesh to the saved file, largest first
+def get_size_breakdown():
+    sizes = [(get_image_size(img), 'IMAGE', img.name) for img in bpy.data.images if img.users]
+    sizes += [(get_mesh_size(mesh), 'MESH', mesh.name) for mesh in bpy.data.meshes if mesh.users]
+    return sorted(sizes, reverse=True)
+
+# write an image to a file in its current format
+def save_image(img, filepath, quality):
+    try:
+        img.save(filepath=filepath, quality=quality)
+    except TypeError:
+        # Before Blender 3.4, images are saved to their own path
+        filepath_raw = img.filepath_raw
+        img.filepath_raw = filepath
+        try:
+            img.save()
+        finally:
+            img.filepath_raw = filepath_raw
+
+# halve the size of a packed image, and pack it again in its original format
+# returns the new packed size, or None if it is not smaller (the image is then restored)
+def shrink_image(img):
+    import shutil
+    import tempfile
+
+    original = bytes(img.packed_file.data)
+    width, height = img.size
+    file_format = img.file_format
+    quality = SKETCHFAB_LOSSY_QUALITY if file_format in SKETCHFAB_LOSSY_FORMATS else 0
+
+    # img.pack() would always pack the modified pixels as PNG
+    tempdir = tempfile.mkdtemp()
+    try:
+        img.scale(max(1, width // 2), max(1, height // 2))
+        img.file_format = file_format
+        filepath = os.path.join(tempdir, "shrunk")
+        save_image(img, filepath, quality)
+        with open(filepath, 'rb') as f:
+            data = f.read()
+    finally:
+        shutil.rmtree(tempdir, ignore_errors=True)
+
+    if len(data) >= len(original):
+        img.pack(data=original, data_len=len(original))
+        img.reload()
+        return None
+    img.pack(data=data, data_len=len(data))
+    return len(data)
+
+# save a copy of the current blendfile, compressed as it will be uploaded
+def save_compressed_copy(compress, compression):
+    filepath, filename, size = save_blend_copy(compress)
+    if compression is not None:
+        report_progress('compress', size=size)
+        size = compression(filepath)
+    return filepath, filename, size
+
+# downscale the largest packed textures until the saved file fits in the limit
+def fit_to_size_limit(size_limit, compress, compression=None):
+    filepath, filename, size = save_compressed_copy(compress, compression)
+    step = 0
+    unshrinkable = set()
+    while size > size_limit and step < SKETCHFAB_MAX_FIT_STEPS:
+        step += 1
+
+        # Float images would be packed as OpenEXR, which is larger
+        candidates = sorted(
+            ((img.packed_file.size, img) for img in bpy.data.images
+             if img.users and img.packed_file and not img.is_float and min(img.size) > SKETCHFAB_MIN_TEXTURE_SIZE
+             and img.name not in unshrinkable),
+            key=lambda candidate: candidate[0], reverse=True)
+        if not candidates:
+            break
+
+        # Shrink the largest images, until they should save the size above the limit
+        excess = size - size_limit
+        saved = 0
+        for image_size, img in candidates:
+            if saved >= excess:
+                break
+            report_progress('shrink', fit_step=step, name=img.name)
+            width, height = img.size
+            new_size = shrink_image(img)
+            if new_size is None:
+                print("Step {}: {} is not smaller once halved, kept as it is".format(step, img.name))
+                unshrinkable.add(img.name)
+                continue
+            saved += image_size - new_size
+            print("Step {}: {} {}x{} -> {}x{}, {} -> {} bytes".format(
+                  step, img.name, width, height, img.size[0], img.size[1], image_size, new_size))
+        if not saved:
+            # None of the images got smaller, saving again would not change anything
+            break
+
+        os.remove(filepath)
+        filepath, filename, size = save_compressed_copy(compress, compression)
+        report_progress('fit', fit_step=step, size=size, limit=size_limit)
+        print("Step {}: file size {} bytes (limit {} bytes)".format(step, size, size_limit))
+
+    if size > size_limit:
+        print("Could not fit the file in the upload limit, largest contributors:")
+        for contribution, datablock_type, name in get_size_breakdown()[:10]:
+            print("  {} {}: {} bytes".format(datablock_type.lower(), name, contribution))
+    return filepath, filename, size
+
+# compression of the addon, when it compresses the saved file itself
+def get_compression(export_settings):
+    method = export_settings.get('compression')
+    if method not in {'GZIP', 'ZSTD'}:
+        return None
+
+    # Reuse the multithreaded compression of the addon
+    sys.path.append(export_settings['addon_path'])
+    addon = importlib.import_module(export_settings['addon'])
+    level = export_settings['compression_level']
+    return lambda filepath: addon.compress_blend_file(filepath, method, level)
 
 def prepare_file(export_settings):
     prepare_assets(export_settings)
-    return save_blend_copy()
+    # The addon may compress the file itself afterwards
+    compress = export_settings.get('compress', True)
+    if export_settings.get('size_limit'):
+        # The limit applies to the uploaded file, so it is compressed here
+        compression = get_compression(export_settings)
+        return fit_to_size_limit(export_settings['size_limit'], compress, compression) + (compression is not None,)
+    return save_blend_copy(compress) + (False,)
 
 def read_settings():
-    with open(SKETCHFAB_EXPORT_DATA_FILE, 'r') as s:
+    with open(get_data_file(), 'r') as s:
         return json.load(s)
 
-def write_result(filepath, filename, size):
-    with open(SKETCHFAB_EXPORT_DATA_FILE, 'w') as s:
+def write_result(filepath, filename, size, compressed):
+    with open(get_data_file(), 'w') as s:
         json.dump({
                 'filepath': filepath,
                 'filename': filename,
                 'size': size,
+                'compressed': compressed,
                 }, s)
 
         
 if __name__ == "__main__":
     try:
         export_settings = read_settings()
-        filepath, filename, size = prepare_file(export_settings)
-        write_result(filepath, filename, size)
+        filepath, filename, size, compressed = prepare_file(export_settings)
+        write_result(filepath, filename, size, compressed)
     except:
         import traceback
         traceback.print_exc()